@@ -1,10 +1,15 @@
 import sys
 import os
-import requests
+import aiohttp
 import re
 import random
 import asyncio
+import hashlib
 import logging
+import sqlite3
+import uuid
+from collections import OrderedDict
+from datetime import datetime
 from typing import List, Dict, Optional, Tuple
 from urllib.parse import quote
 from pathlib import Path
@@ -15,13 +20,115 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")
 from agents.base_agent import BaseAgent
 from schemas.agent_state import AgentState
 from schemas.enriched_article import EnrichedArticle, ImageBriefKey
+from utils.rate_limiter import RateLimiter
 
 try:
     from runware import Runware, IImageInference
     RUNWARE_AVAILABLE = True
 except ImportError:
     RUNWARE_AVAILABLE = False
-    print("⚠️  Warning: Runware SDK not available. Will use Pixabay only.")
+    logging.getLogger(__name__).warning(
+        "⚠️  Runware SDK not available. Will use Pixabay only."
+    )
+
+# Runware generation settings (also part of the in-flight request key)
+AI_IMAGE_WIDTH = 1024  # Mobile portrait: 9:16 aspect ratio
+AI_IMAGE_HEIGHT = 576  # Taller than wide for mobile
+AI_IMAGE_MODEL = "runware:100@1"  # CHEAP MODEL
+AI_IMAGE_STEPS = 5  # Good balance between quality and speed
+
+# Markdown image placeholders: ![alt text](PLACEHOLDER_IMAGE)
+_PLACEHOLDER_RE = re.compile(r"!\[([^\]]*)\]\(PLACEHOLDER_IMAGE\)")
+# Runs of characters that are not safe in image filenames
+_TITLE_STRIP_RE = re.compile(r"[^a-z0-9]+")
+# Pixabay query normalisation: commas become spaces, length is capped
+_TERM_TRANS = str.maketrans({",": " "})
+_MAX_SEARCH_TERM_LENGTH = 60
+# Images are streamed to disk in chunks of this size
+_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# Public URL prefix of images saved under image_storage_path
+_WEB_IMAGE_PREFIX = "/static/images/articles/"
+# How long AI generation runs alone before an image search is started next to it
+_AI_HEAD_START_SECONDS = 2.0
+# How many times a rate-limited (429) request is retried after backing off
+_RATE_LIMIT_RETRIES = 3
+
+
+def _is_rate_limit_error(error: Exception) -> bool:
+    """Best-effort detection of rate-limit errors raised by the Runware SDK."""
+    message = str(error).lower()
+    return "429" in message or "rate limit" in message or "too many requests" in message
+
+
+def _is_connection_error(error: Exception) -> bool:
+    """Best-effort detection of a dropped or unusable Runware websocket."""
+    if isinstance(error, (ConnectionError, OSError, asyncio.TimeoutError)):
+        return True
+    message = str(error).lower()
+    return any(
+        marker in message
+        for marker in ("connection", "websocket", "not connected", "closed")
+    )
+
+
+class _ImageIndex:
+    """Persistent key -> saved image URL maps stored in SQLite.
+
+    ``ai_images`` maps AI request hashes to generated images, ``content`` maps
+    hashes of downloaded bytes to the file that already holds them.
+
+    ``set`` only records the entry in memory (``get`` sees it at once);
+    ``flush`` writes everything recorded in one transaction and blocks, so
+    async callers run it in a thread.
+    """
+
+    TABLES = ("ai_images", "content")
+
+    def __init__(self, db_path: Path):
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        for table in self.TABLES:
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, web_url TEXT NOT NULL)"
+            )
+        self._conn.commit()
+        self._pending: Dict[Tuple[str, str], str] = {}
+
+    @staticmethod
+    def make_key(*parts) -> str:
+        return hashlib.sha256("\x1f".join(map(str, parts)).encode("utf-8")).hexdigest()
+
+    def get(self, table: str, key: str) -> Optional[str]:
+        pending = self._pending.get((table, key))
+        if pending is not None:
+            return pending
+        row = self._conn.execute(
+            f"SELECT web_url FROM {table} WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, table: str, key: str, web_url: str) -> None:
+        self._pending[(table, key)] = web_url
+
+    def flush(self) -> None:
+        """Persist the entries recorded since the last flush with one commit."""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        with self._conn:
+            for table in self.TABLES:
+                rows = [(k, url) for (t, k), url in pending.items() if t == table]
+                if rows:
+                    self._conn.executemany(
+                        f"INSERT OR REPLACE INTO {table} (key, web_url) VALUES (?, ?)",
+                        rows,
+                    )
+
+    def close(self) -> None:
+        """Flush what is still recorded and close the SQLite connection."""
+        try:
+            self.flush()
+        finally:
+            self._conn.close()
 
 
 class ArticleImageGeneratorAgent(BaseAgent):
@@ -35,6 +142,8 @@ class ArticleImageGeneratorAgent(BaseAgent):
         runware_api_key: Optional[str] = None,
         image_storage_path: str = "static/images/articles",
         use_ai_generation: bool = True,
+        max_concurrent_images: int = 5,
+        max_concurrent_articles: int = 4,
     ):
         super().__init__(llm=None, prompt=None, name="ArticleImageGeneratorAgent")
         self.logger = logging.getLogger(__name__)
@@ -43,6 +152,32 @@ class ArticleImageGeneratorAgent(BaseAgent):
         self.use_ai_generation = use_ai_generation and RUNWARE_AVAILABLE
         self.image_storage_path = Path(image_storage_path)
         self.image_storage_path.mkdir(parents=True, exist_ok=True)
+        # Survives restarts: identical AI requests and identical downloaded
+        # bytes reuse the image saved last time
+        self._image_index = _ImageIndex(
+            self.image_storage_path / ".image_index.sqlite3"
+        )
+        # Upper bound for placeholders resolved at the same time (AI + Pixabay)
+        self.max_concurrent_images = max_concurrent_images
+        # Upper bound for articles processed at the same time (Pixabay free-tier QPS)
+        self.max_concurrent_articles = max_concurrent_articles
+        # Shared HTTP session (keep-alive pool) for Pixabay search and downloads
+        self._http_session: Optional[aiohttp.ClientSession] = None
+        # LRU cache of Pixabay hits keyed by (clean_term, lang_code)
+        self._pixabay_cache: "OrderedDict[Tuple[str, str], List[dict]]" = OrderedDict()
+        self._pixabay_cache_size = 512
+        # Token buckets in front of each external API
+        self._pixabay_limiter = RateLimiter(rate=5, per=1.0, burst=10)
+        self._runware_limiter = RateLimiter(rate=5, per=1.0, burst=10)
+        # Runware requests currently running, so duplicate prompts share one call
+        self._inflight_ai: Dict[
+            Tuple[str, str, int, int, str, int], asyncio.Future
+        ] = {}
+        # Event loop owned by the agent; the HTTP session and the Runware
+        # websocket are bound to it and stay open between runs until close()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._runware_connected = False
+        self._runware_lock: Optional[asyncio.Lock] = None
         # Initialize Runware if available
         self.runware = None
         if self.use_ai_generation and self.runware_api_key:
@@ -55,28 +190,64 @@ class ArticleImageGeneratorAgent(BaseAgent):
         )
         
     async def _generate_ai_image(
-        self, prompt: str, negative_prompt: Optional[str] = None
-    ) -> Optional[str]:
-        """Generate an image using Runware AI - returns image URL directly"""
+        self,
+        prompt: str,
+        negative_prompt: Optional[str] = None,
+        number_results: int = 1,
+    ) -> List[str]:
+        """Generate images using Runware AI - returns image URLs directly.
+
+        Concurrent calls with the same request parameters are coalesced: only
+        the first one hits Runware, the others await its result.
+        """
         if not self.runware:
-            return None
+            return []
+
+        negative_prompt = negative_prompt or self.default_negative_prompt
+        request_key = (
+            prompt,
+            negative_prompt,
+            AI_IMAGE_WIDTH,
+            AI_IMAGE_HEIGHT,
+            AI_IMAGE_MODEL,
+            number_results,
+        )
 
+        inflight = self._inflight_ai.get(request_key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight_ai[request_key] = future
         try:
-            # Connect to Runware if not connected
-            if not hasattr(self, "_runware_connected"):
-                await self.runware.connect()
-                self._runware_connected = True
+            image_urls = await self._run_ai_inference(
+                prompt, negative_prompt, number_results
+            )
+            future.set_result(image_urls)
+            return image_urls
+        finally:
+            self._inflight_ai.pop(request_key, None)
+            if not future.done():
+                # Cancelled before finishing - release any waiters empty-handed
+                future.set_result([])
+
+    async def _run_ai_inference(
+        self, prompt: str, negative_prompt: str, number_results: int = 1
+    ) -> List[str]:
+        """Run a single Runware image inference request."""
+        try:
+            await self._ensure_runware_connected()
 
             # Prepare image generation request
             request = IImageInference(
                 positivePrompt=prompt,
-                negativePrompt=negative_prompt or self.default_negative_prompt,
-                width=1024,  # Mobile portrait: 9:16 aspect ratio
-                height=576,  # Taller than wide for mobile
-                model="runware:100@1",  # CHEAP MODEL
-                steps=5,  # Good balance between quality and speed
+                negativePrompt=negative_prompt,
+                width=AI_IMAGE_WIDTH,
+                height=AI_IMAGE_HEIGHT,
+                model=AI_IMAGE_MODEL,
+                steps=AI_IMAGE_STEPS,
                 CFGScale=7,  # High prompt adherence
-                numberResults=1,
+                numberResults=number_results,
                 outputType="URL",  # Get URL directly
                 outputFormat="WEBP",  # Better compression than JPG
                 outputQuality=85,  # Good quality without max size
@@ -84,21 +255,105 @@ class ArticleImageGeneratorAgent(BaseAgent):
             )
 
             # Generate image
-            images = await self.runware.imageInference(requestImage=request)
+            for attempt in range(_RATE_LIMIT_RETRIES + 1):
+                await self._runware_limiter.acquire()
+                try:
+                    images = await self.runware.imageInference(requestImage=request)
+                except Exception as e:
+                    if attempt < _RATE_LIMIT_RETRIES and _is_rate_limit_error(e):
+                        delay = self._runware_limiter.backoff()
+                        self.logger.warning(
+                            "Runware rate limited, backing off %.1fs", delay
+                        )
+                        continue
+                    if _is_connection_error(e):
+                        # The socket sits idle between graph runs and may have
+                        # dropped; connect again (now or on the next call)
+                        self._runware_connected = False
+                        if attempt < _RATE_LIMIT_RETRIES:
+                            self.logger.warning(
+                                "Runware connection lost (%s), reconnecting", e
+                            )
+                            await self._ensure_runware_connected()
+                            continue
+                    raise
+                self._runware_limiter.success()
+                break
 
             if images and len(images) > 0:
-                image_url = images[0].imageURL
-                self.logger.info(f"✅ AI generated image: {image_url}")
-                return image_url
+                image_urls = [image.imageURL for image in images]
+                self.logger.info("✅ AI generated %d image(s): %s", len(image_urls), image_urls)
+                return image_urls
             else:
                 self.logger.error("❌ No images returned from AI generation")
-                return None
+                return []
 
         except Exception as e:
-            self.logger.error(f"❌ Failed to generate AI image: {e}")
-            return None
+            self.logger.error("❌ Failed to generate AI image: %s", e)
+            return []
+
+    async def _ensure_runware_connected(self) -> None:
+        """Connect to Runware if not connected; concurrent callers wait on the same lock.
+
+        ``_runware_connected`` is cleared when a call fails with a connection
+        error, so the next call connects again.
+        """
+        if self._runware_connected:
+            return
+        if self._runware_lock is None:
+            self._runware_lock = asyncio.Lock()
+        async with self._runware_lock:
+            if not self._runware_connected:
+                await self.runware.connect()
+                self._runware_connected = True
 
-    def _search_pixabay_image(
+    def _get_http_session(self) -> aiohttp.ClientSession:
+        """Return the pooled HTTP session, creating it on first use."""
+        if self._http_session is None or self._http_session.closed:
+            self._http_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=20, keepalive_timeout=30)
+            )
+        return self._http_session
+
+    async def _close_http_session(self) -> None:
+        """Close the pooled HTTP session if it is open."""
+        if self._http_session is not None and not self._http_session.closed:
+            await self._http_session.close()
+        self._http_session = None
+
+    async def _pixabay_fetch(self, clean_term: str, lang_code: str) -> List[dict]:
+        """Fetch Pixabay hits for a term, served from the LRU cache when possible."""
+        cache_key = (clean_term, lang_code)
+        cached_hits = self._pixabay_cache.get(cache_key)
+        if cached_hits is not None:
+            self._pixabay_cache.move_to_end(cache_key)
+            return cached_hits
+
+        # Increase per_page to get more options
+        url = f"https://pixabay.com/api/?key={self.pixabay_api_key}&q={clean_term}&safesearch=true&order=popular&image_type=photo&orientation=horizontal&per_page=10&lang={lang_code}"
+
+        session = self._get_http_session()
+        for attempt in range(_RATE_LIMIT_RETRIES + 1):
+            await self._pixabay_limiter.acquire()
+            async with session.get(
+                url, timeout=aiohttp.ClientTimeout(total=10)
+            ) as response:
+                if response.status == 429 and attempt < _RATE_LIMIT_RETRIES:
+                    delay = self._pixabay_limiter.backoff()
+                    self.logger.warning("Pixabay rate limited, backing off %.1fs", delay)
+                    continue
+                response.raise_for_status()
+                data = await response.json()
+            self._pixabay_limiter.success()
+            break
+
+        hits = data.get("hits") or []
+        self._pixabay_cache[cache_key] = hits
+        if len(self._pixabay_cache) > self._pixabay_cache_size:
+            self._pixabay_cache.popitem(last=False)
+        return hits
+
+    async def _search_pixabay_image(
         self, search_term: str, language: str = "en", used_images: set = None
     ) -> Optional[str]:
         """Search for a single relevant image from Pixabay (fallback method)."""
@@ -107,32 +362,30 @@ class ArticleImageGeneratorAgent(BaseAgent):
 
         try:
             # Clean and prepare search term
-            clean_term = quote(search_term.lower().replace(",", " ").strip())
+            clean_term = quote(
+                search_term.translate(_TERM_TRANS).strip().lower()[:_MAX_SEARCH_TERM_LENGTH],
+                safe="",
+            )
 
             # Always use English API since LLM is instructed to provide English search terms
             lang_code = "en"
 
-            # Increase per_page to get more options
-            url = f"https://pixabay.com/api/?key={self.pixabay_api_key}&q={clean_term}&safesearch=true&order=popular&image_type=photo&orientation=horizontal&per_page=10&lang={lang_code}"
-
-            print(
-                f"           - Searching Pixabay for: '{search_term}' (API language: {lang_code})"
+            self.logger.debug(
+                "Searching Pixabay for: '%s' (API language: %s)", search_term, lang_code
             )
 
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            data = response.json()
+            hits = await self._pixabay_fetch(clean_term, lang_code)
 
-            if data.get("hits") and len(data["hits"]) > 0:
+            if hits:
                 # Filter out already used images
                 available_hits = [
                     hit
-                    for hit in data["hits"]
+                    for hit in hits
                     if hit["webformatURL"] not in used_images
                 ]
 
                 if not available_hits:
-                    print(f"           - All images already used for: '{search_term}'")
+                    self.logger.debug("All images already used for: '%s'", search_term)
                     return None
 
                 # Randomly select from first 3 available results
@@ -141,17 +394,16 @@ class ArticleImageGeneratorAgent(BaseAgent):
 
                 # Use 340px width for smaller file size
                 image_url = hit["webformatURL"].replace("_640", "_340")
-                print(f"           - Found image: {image_url}")
-                print(
-                    f"           - Image tags: {hit.get('tags', 'N/A')}"
-                )  # Debug: show image tags
+                self.logger.debug("Found image: %s", image_url)
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug("Image tags: %s", hit.get("tags", "N/A"))
                 return image_url
             else:
-                print(f"           - No images found for: '{search_term}'")
+                self.logger.debug("No images found for: '%s'", search_term)
                 return None
 
         except Exception as e:
-            print(f"           - Error searching Pixabay for '{search_term}': {e}")
+            self.logger.warning("Error searching Pixabay for '%s': %s", search_term, e)
             return None
 
     def _extract_image_placeholders(
@@ -162,13 +414,20 @@ class ArticleImageGeneratorAgent(BaseAgent):
         Returns list of tuples: (full_match, alt_text)
         e.g., [('![main topic](PLACEHOLDER_IMAGE)', 'main topic'), ...]
         """
-        # Match markdown image placeholders: ![alt text](PLACEHOLDER_IMAGE)
-        pattern = r"!\[([^\]]*)\]\(PLACEHOLDER_IMAGE\)"
-        matches = re.findall(pattern, markdown_content)
-
-        # Return both full match and alt text
-        full_matches = re.finditer(pattern, markdown_content)
-        return [(match.group(0), match.group(1)) for match in full_matches]
+        return [
+            (match.group(0), match.group(1))
+            for match in _PLACEHOLDER_RE.finditer(markdown_content)
+        ]
+
+    @staticmethod
+    def _dedupe_search_terms(terms: List[Optional[str]]) -> List[str]:
+        """Strip terms and drop empty or case-insensitive duplicates, keeping order."""
+        unique_terms: Dict[str, str] = {}
+        for term in terms:
+            term = (term or "").strip()
+            if term:
+                unique_terms.setdefault(term.casefold(), term)
+        return list(unique_terms.values())
 
     def _get_fallback_search_terms(self, categories: List[str]) -> List[str]:
         """Generate fallback search terms based on article categories."""
@@ -202,24 +461,18 @@ class ArticleImageGeneratorAgent(BaseAgent):
 
         return fallback_terms
 
-    def _download_and_save_image(
-        self, image_url: str, article_title: str, image_index: int
+    async def _download_and_save_image(
+        self, image_url: str, article_title: str
     ) -> Optional[str]:
-        """Download image from URL and save it locally."""
-        try:
-            # Create unique filename from article title
-            from datetime import datetime
+        """Download image from URL and save it locally.
 
+        Files are content-addressed: if the same bytes were saved before, the
+        existing file is reused and the new download is discarded.
+        """
+        try:
             # Clean title (first 20 chars, safe for filename)
-            clean_title = article_title[:20].lower()
-            clean_title = re.sub(
-                r"[^a-z0-9\s]", "", clean_title
-            )  # Remove special chars
-            clean_title = re.sub(
-                r"\s+", "_", clean_title.strip()
-            )  # Replace spaces with underscore
-
-            # Add date and image index
+            clean_title = _TITLE_STRIP_RE.sub("_", article_title[:20].lower()).strip("_")
+
             date_str = datetime.now().strftime("%Y%m%d")
             # Determine file extension from URL
             extension = "jpg"
@@ -227,27 +480,54 @@ class ArticleImageGeneratorAgent(BaseAgent):
                 extension = "webp"
             elif ".png" in image_url.lower():
                 extension = "png"
-            filename = f"{clean_title}_{image_index}_{date_str}.{extension}"
-            local_path = self.image_storage_path / filename
-
-            print(f"           - Downloading image to: {local_path}")
+            # Stream into a temporary file so a failed download never leaves a partial image
+            part_path = self.image_storage_path / f".{uuid.uuid4().hex}.part"
 
-            # Download image
-            response = requests.get(image_url, timeout=30)
-            response.raise_for_status()
+            self.logger.debug("Downloading image: %s", image_url)
 
-            # Save image
-            with open(local_path, "wb") as f:
-                f.write(response.content)
-
-            # Return relative URL for web usage
-            web_url = f"/static/images/articles/{filename}"
-            print(f"           - Saved as: {web_url}")
+            # Download image, hashing and saving it chunk by chunk
+            content_hash = hashlib.blake2b(digest_size=16)
+            session = self._get_http_session()
+            try:
+                async with session.get(
+                    image_url, timeout=aiohttp.ClientTimeout(total=30)
+                ) as response:
+                    response.raise_for_status()
+                    # Disk writes run in a worker thread so they don't stall the event loop
+                    f = await asyncio.to_thread(open, part_path, "wb")
+                    try:
+                        async for chunk in response.content.iter_chunked(
+                            _DOWNLOAD_CHUNK_SIZE
+                        ):
+                            content_hash.update(chunk)
+                            await asyncio.to_thread(f.write, chunk)
+                    finally:
+                        await asyncio.to_thread(f.close)
+
+                digest = content_hash.hexdigest()
+                # SQLite lookup and file check run in the thread like the writes
+                existing_url = await asyncio.to_thread(self._saved_content_url, digest)
+                if existing_url:
+                    self.logger.debug("Same image already saved as: %s", existing_url)
+                    return existing_url
+
+                filename = f"{clean_title}_{date_str}_{digest}.{extension}"
+                await asyncio.to_thread(
+                    part_path.replace, self.image_storage_path / filename
+                )
+            finally:
+                await asyncio.to_thread(part_path.unlink, missing_ok=True)
+
+            # Return relative URL for web usage; the index is committed at the
+            # end of the run (see _process_articles)
+            web_url = f"{_WEB_IMAGE_PREFIX}{filename}"
+            self._image_index.set("content", digest, web_url)
+            self.logger.debug("Saved as: %s", web_url)
 
             return web_url
 
         except Exception as e:
-            print(f"           - Error downloading image: {e}")
+            self.logger.warning("Error downloading image %s: %s", image_url, e)
             return None
 
     async def _get_image_for_search_term_async(
@@ -269,32 +549,240 @@ class ArticleImageGeneratorAgent(BaseAgent):
                 f"professional news photography, {clean_term}, high quality, clear, editorial style"
             )
 
-            ai_image_url = await self._generate_ai_image(
+            ai_image_urls = await self._generate_ai_image(
                 positive_prompt,
                 self.default_negative_prompt,
             )
 
-            if ai_image_url:
-                print(f"           - ✅ Successfully generated AI image")
-                return ai_image_url
+            if ai_image_urls:
+                self.logger.debug("✅ Successfully generated AI image")
+                return ai_image_urls[0]
 
-            print(f"           - ⚠️ AI generation failed, falling back to image search")
+            self.logger.debug("⚠️ AI generation failed, falling back to image search")
 
-        print(f"           - Using Pixabay fallback for: '{clean_term}'")
-        return self._search_pixabay_image(clean_term, article_language, used_images)
+        self.logger.debug("Using Pixabay fallback for: '%s'", clean_term)
+        return await self._search_pixabay_image(
+            clean_term, article_language, used_images
+        )
 
-    def _process_article_images(self, article: EnrichedArticle) -> EnrichedArticle:
-        """Process all images in an enriched article."""
-        print(f"     - Article: {article.enriched_title[:50]}...")
+    async def _search_placeholder_terms(
+        self,
+        article: EnrichedArticle,
+        search_terms: List[str],
+        attempted_ai: bool,
+        used_images: set,
+        semaphore: asyncio.Semaphore,
+    ) -> Optional[str]:
+        """Try the search terms in order; AI is only allowed for the first term
+        when it has not been attempted for this placeholder yet."""
+        async with semaphore:
+            for idx, term in enumerate(search_terms):
+                if not term:
+                    continue
+
+                allow_ai = not attempted_ai and idx == 0
+                image_url = await self._get_image_for_search_term_async(
+                    term,
+                    used_images,
+                    article.language,
+                    ai_prompt=None,
+                    allow_ai=allow_ai,
+                )
+
+                attempted_ai = attempted_ai or allow_ai
+
+                if image_url:
+                    self.logger.debug("Found image with term: '%s'", term)
+                    return image_url
+        return None
+
+    async def _resolve_placeholder_image(
+        self,
+        article: EnrichedArticle,
+        search_terms: List[str],
+        ai_task: Optional["asyncio.Future[Optional[str]]"],
+        ai_cache_key: Optional[str],
+        used_images: set,
+        semaphore: asyncio.Semaphore,
+    ) -> Optional[str]:
+        """Find an image for one placeholder and download it. Returns the local URL.
+
+        ``ai_task`` resolves to the image generated for this placeholder's
+        prompt (if AI is used). If it hasn't finished after a short head start,
+        the image search is started speculatively alongside it; a successful
+        AI image still wins, otherwise the search result is used. A freshly
+        downloaded AI image is stored in the persistent cache under
+        ``ai_cache_key``.
+        """
+        ai_image_url = None
+        search_task = None
+
+        if ai_task is None:
+            image_url = await self._search_placeholder_terms(
+                article, search_terms, False, used_images, semaphore
+            )
+        else:
+            try:
+                done, _ = await asyncio.wait({ai_task}, timeout=_AI_HEAD_START_SECONDS)
+                if not done:
+                    search_task = asyncio.create_task(
+                        self._search_placeholder_terms(
+                            article, search_terms, True, used_images, semaphore
+                        )
+                    )
+
+                ai_image_url = await ai_task
+                if ai_image_url:
+                    image_url = ai_image_url
+                else:
+                    self.logger.debug(
+                        "⚠️ AI generation failed, falling back to image search"
+                    )
+                    if search_task is None:
+                        search_task = asyncio.create_task(
+                            self._search_placeholder_terms(
+                                article, search_terms, True, used_images, semaphore
+                            )
+                        )
+                    image_url = await search_task
+            finally:
+                # AI won the race - the speculative search is no longer needed
+                if search_task is not None and not search_task.done():
+                    search_task.cancel()
+
+        if image_url and image_url.startswith(_WEB_IMAGE_PREFIX):
+            self.logger.debug("✅ Using cached AI image: %s", image_url)
+            return image_url
+
+        if image_url == ai_image_url and image_url:
+            self.logger.debug("✅ Using AI generated image")
+
+        if not image_url:
+            return None
+
+        # Add to used images set
+        used_images.add(image_url)
+
+        # Download image locally (works for both AI and Pixabay URLs)
+        async with semaphore:
+            local_url = await self._download_and_save_image(
+                image_url, article.enriched_title
+            )
+
+        if local_url and ai_cache_key and image_url == ai_image_url:
+            self._image_index.set("ai_images", ai_cache_key, local_url)
+
+        return local_url
+
+    def _ai_cache_key(self, prompt: str, variant: int) -> str:
+        """Hash of everything that determines a generated image."""
+        return _ImageIndex.make_key(
+            prompt,
+            self.default_negative_prompt,
+            AI_IMAGE_MODEL,
+            AI_IMAGE_WIDTH,
+            AI_IMAGE_HEIGHT,
+            AI_IMAGE_STEPS,
+            variant,
+        )
+
+    def _get_cached_ai_images(
+        self, cache_keys: List[Optional[str]]
+    ) -> List[Optional[str]]:
+        """Local URLs of cached AI images still on disk (blocking; run it in a thread)."""
+        return [
+            self._existing_image(self._image_index.get("ai_images", key)) if key else None
+            for key in cache_keys
+        ]
+
+    def _saved_content_url(self, digest: str) -> Optional[str]:
+        """URL of an existing file with these bytes (blocking; run it in a thread)."""
+        return self._existing_image(self._image_index.get("content", digest))
+
+    def _existing_image(self, web_url: Optional[str]) -> Optional[str]:
+        """Return ``web_url`` if the file behind it is still on disk."""
+        if not web_url:
+            return None
+        if not (self.image_storage_path / Path(web_url).name).exists():
+            return None
+        return web_url
+
+    async def _start_batched_ai_images(
+        self, prompts: List[str], semaphore: asyncio.Semaphore
+    ) -> Tuple[List[Optional["asyncio.Future[Optional[str]]"]], List[Optional[str]]]:
+        """Start generating one AI image per prompt, batching identical prompts.
+
+        Placeholders sharing a prompt are served by a single Runware call with
+        ``numberResults`` set to the group size. Images already in the
+        persistent cache resolve immediately to their local URLs.
+
+        Returns ``(ai_tasks, cache_keys)`` aligned with ``prompts``. Each task
+        resolves to the image URL, or None if generation failed; the task is
+        None where the prompt was empty.
+        """
+        loop = asyncio.get_running_loop()
+        ai_tasks: List[Optional[asyncio.Future]] = [None] * len(prompts)
+        cache_keys: List[Optional[str]] = [None] * len(prompts)
+
+        # Prompt -> placeholder indices still needing generation
+        groups: Dict[str, List[int]] = {}
+        variants: Dict[str, int] = {}
+        for index, prompt in enumerate(prompts):
+            if not prompt:
+                continue
+            variant = variants.get(prompt, 0)
+            variants[prompt] = variant + 1
+            cache_keys[index] = self._ai_cache_key(prompt, variant)
+
+        # All index lookups and file checks in one trip to a worker thread
+        cached_urls = await asyncio.to_thread(self._get_cached_ai_images, cache_keys)
+        for index, prompt in enumerate(prompts):
+            if not prompt:
+                continue
+            cached_url = cached_urls[index]
+            if cached_url:
+                ai_tasks[index] = loop.create_future()
+                ai_tasks[index].set_result(cached_url)
+            else:
+                groups.setdefault(prompt, []).append(index)
+
+        async def generate(prompt: str, count: int) -> List[str]:
+            async with semaphore:
+                return await self._generate_ai_image(
+                    prompt, self.default_negative_prompt, number_results=count
+                )
+
+        async def pick(group_task: asyncio.Task, offset: int) -> Optional[str]:
+            # Shielded: one placeholder giving up must not cancel the shared call
+            urls = await asyncio.shield(group_task)
+            return urls[offset] if offset < len(urls) else None
+
+        for prompt, indices in groups.items():
+            group_task = asyncio.create_task(generate(prompt, len(indices)))
+            for offset, index in enumerate(indices):
+                ai_tasks[index] = asyncio.create_task(pick(group_task, offset))
+
+        return ai_tasks, cache_keys
+
+    async def _process_article_images(
+        self, article: EnrichedArticle, semaphore: asyncio.Semaphore
+    ) -> EnrichedArticle:
+        """Process all images in an enriched article.
+
+        Search terms are picked sequentially (LLM suggestions are handed out in
+        placeholder order), then every placeholder is resolved concurrently and
+        the results are applied back to the content in the original order.
+        """
+        self.logger.info("Article: %.50s...", article.enriched_title)
 
         # Extract all image placeholders
         placeholders = self._extract_image_placeholders(article.enriched_content)
 
         if not placeholders:
-            print(f"     - No image placeholders found")
+            self.logger.info("No image placeholders found")
             return article
 
-        print(f"     - Found {len(placeholders)} image placeholder(s)")
+        self.logger.info("Found %d image placeholder(s)", len(placeholders))
 
         # Normalize structured image briefs (hero/supporting) for quick lookup
         raw_briefs = getattr(article, "image_generation_briefs", None)
@@ -312,218 +800,244 @@ class ArticleImageGeneratorAgent(BaseAgent):
         # Track used images to avoid duplicates
         used_images = set()
         hero_image_url = None
-        updated_content = article.enriched_content
         successful_replacements = 0
 
         # Get LLM image suggestions if available
         llm_suggestions = getattr(article, "image_suggestions", []) or []
         used_llm_suggestions = set()
 
-        # Run async image generation
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-
-        try:
-            for i, (full_match, alt_text) in enumerate(placeholders):
-                print(f"\n     - Processing placeholder {i+1}/{len(placeholders)}")
-                print(f"       Alt text: '{alt_text}'")
-
-                brief_key: Optional[str] = None
-                if i == 0:
-                    brief_key = ImageBriefKey.HERO.value
-                elif i == 1:
-                    brief_key = ImageBriefKey.SUPPORTING.value
-
-                structured_brief = image_briefs.get(brief_key) if brief_key else None
-                if structured_brief:
-                    print(f"       Structured brief ({brief_key}): {structured_brief}")
-
-                # Strategy: Use alt text first, then LLM suggestions, then category fallbacks
-                search_terms: List[str] = []
-
-                if alt_text and alt_text.strip():
-                    cleaned_alt = alt_text.strip()
-                    search_terms.append(cleaned_alt)
-                    print(
-                        f"           - Using alt text as search term: '{cleaned_alt}'"
-                    )
-
-                available_llm_suggestions = [
-                    s for s in llm_suggestions if s not in used_llm_suggestions
-                ]
-                if available_llm_suggestions:
-                    primary_llm_suggestion = available_llm_suggestions[0]
-                    search_terms.append(primary_llm_suggestion)
-                    used_llm_suggestions.add(primary_llm_suggestion)
-                    print(
-                        f"           - Using LLM suggestion: '{primary_llm_suggestion}'"
-                    )
-
-                if not search_terms:
-                    fallback_terms = self._get_fallback_search_terms(article.categories)
-                    search_terms.extend(fallback_terms)
-                    print(
-                        f"           - Using fallback terms from categories: {fallback_terms}"
-                    )
-
-                if not search_terms:
-                    fallback_term = article.enriched_title or "news story"
-                    search_terms.append(fallback_term)
+        placeholder_terms: List[List[str]] = []
+        ai_prompts: List[str] = []
+        for i, (full_match, alt_text) in enumerate(placeholders):
+            self.logger.debug(
+                "Processing placeholder %d/%d, alt text: '%s'",
+                i + 1,
+                len(placeholders),
+                alt_text,
+            )
 
-                image_url = None
-                attempted_ai = False
+            brief_key: Optional[str] = None
+            if i == 0:
+                brief_key = ImageBriefKey.HERO.value
+            elif i == 1:
+                brief_key = ImageBriefKey.SUPPORTING.value
+
+            structured_brief = image_briefs.get(brief_key) if brief_key else None
+            if structured_brief:
+                self.logger.debug(
+                    "Structured brief (%s): %s", brief_key, structured_brief
+                )
+
+            # Strategy: Use alt text first, then LLM suggestions, then category fallbacks
+            cleaned_alt = (alt_text or "").strip()
+            alt_key = cleaned_alt.casefold()
+
+            # Reserve the first unused LLM suggestion that isn't just the alt text again
+            llm_suggestion = next(
+                (
+                    s
+                    for s in llm_suggestions
+                    if s not in used_llm_suggestions and s.strip().casefold() != alt_key
+                ),
+                None,
+            )
+            if llm_suggestion:
+                used_llm_suggestions.add(llm_suggestion)
 
-                base_term_for_prompt = search_terms[0] if search_terms else "news story"
+            search_terms = self._dedupe_search_terms([cleaned_alt, llm_suggestion])
+            self.logger.debug("Search terms from alt text / LLM: %s", search_terms)
 
-                ai_prompt_value = (structured_brief or base_term_for_prompt).strip()
+            if not search_terms:
+                search_terms = self._dedupe_search_terms(
+                    self._get_fallback_search_terms(article.categories)
+                )
+                self.logger.debug(
+                    "Using fallback terms from categories: %s", search_terms
+                )
 
-                if self.use_ai_generation and self.runware and ai_prompt_value:
-                    attempted_ai = True
-                    image_url = loop.run_until_complete(
-                        self._get_image_for_search_term_async(
-                            base_term_for_prompt,
-                            used_images,
-                            article.language,
-                            ai_prompt=ai_prompt_value,
-                            allow_ai=True,
-                        )
-                    )
+            if not search_terms:
+                fallback_term = article.enriched_title or "news story"
+                search_terms.append(fallback_term)
 
-                if not image_url:
-                    for idx, term in enumerate(search_terms):
-                        if not term:
-                            continue
+            base_term_for_prompt = search_terms[0] if search_terms else "news story"
+            ai_prompt_value = (structured_brief or base_term_for_prompt).strip()
 
-                        allow_ai = not attempted_ai and idx == 0
-                        image_url = loop.run_until_complete(
-                            self._get_image_for_search_term_async(
-                                term,
-                                used_images,
-                                article.language,
-                                ai_prompt=None,
-                                allow_ai=allow_ai,
-                            )
-                        )
+            placeholder_terms.append(search_terms)
+            ai_prompts.append(ai_prompt_value)
 
-                        attempted_ai = attempted_ai or allow_ai
-
-                        if image_url:
-                            print(f"           - Found image with term: '{term}'")
-                            break
+        if self.use_ai_generation and self.runware:
+            ai_tasks, ai_cache_keys = await self._start_batched_ai_images(
+                ai_prompts, semaphore
+            )
+        else:
+            ai_tasks = ai_cache_keys = [None] * len(placeholders)
+
+        local_urls = await asyncio.gather(
+            *(
+                self._resolve_placeholder_image(
+                    article,
+                    search_terms,
+                    ai_tasks[i],
+                    ai_cache_keys[i],
+                    used_images,
+                    semaphore,
+                )
+                for i, search_terms in enumerate(placeholder_terms)
+            )
+        )
 
-                if image_url:
-                    # Add to used images set
-                    used_images.add(image_url)
+        # Replacement text for each placeholder, in the same order as finditer
+        replacements: List[str] = []
+        for i, ((full_match, alt_text), local_url) in enumerate(
+            zip(placeholders, local_urls)
+        ):
+            if local_url:
+                # Handle hero image (first placeholder) separately
+                if hero_image_url is None:
+                    hero_image_url = local_url
+                    # Remove the placeholder from the content instead of replacing it
+                    replacements.append("")
+                    self.logger.debug("Set as hero image: %s", local_url)
+                else:
+                    # For other images, replace the placeholder in the content
+                    replacements.append(f"![{alt_text}]({local_url})")
+                    self.logger.debug("Replaced placeholder %d in content", i + 1)
 
-                    # Download image locally (works for both AI and Pixabay URLs)
-                    local_url = self._download_and_save_image(
-                        image_url, article.enriched_title, i + 1
-                    )
+                successful_replacements += 1
+            else:
+                # Remove placeholder if no image was found or download failed
+                replacements.append("")
+                self.logger.debug("Removed placeholder %d (no image)", i + 1)
+
+        # Rewrite all placeholders in a single pass over the content
+        pending_replacements = iter(replacements)
+        updated_content = _PLACEHOLDER_RE.sub(
+            lambda _match: next(pending_replacements, ""), article.enriched_content
+        )
+        if hero_image_url is not None:
+            updated_content = updated_content.strip()
 
-                    if local_url:
-                        # Handle hero image (first placeholder) separately
-                        if hero_image_url is None:
-                            hero_image_url = local_url
-                            # Remove the placeholder from the content instead of replacing it
-                            updated_content = updated_content.replace(
-                                full_match, ""
-                            ).strip()
-                            print(f"           - Set as hero image: {local_url}")
-                            print(f"           - Removed hero placeholder from content")
-                        else:
-                            # For other images, replace the placeholder in the content
-                            replacement = f"![{alt_text}]({local_url})"
-                            updated_content = updated_content.replace(
-                                full_match, replacement
-                            )
-                            print(f"           - Replaced placeholder in content")
-
-                        successful_replacements += 1
-                    else:
-                        # Remove placeholder if download failed
-                        updated_content = updated_content.replace(full_match, "")
-                        print(
-                            f"           - Removed placeholder {i+1} (download failed)"
-                        )
-                else:
-                    # Remove placeholder if no image found
-                    updated_content = updated_content.replace(full_match, "")
-                    print(f"           - Removed placeholder {i+1} (no image found)")
-        finally:
-            # Cleanup async resources
-            if self.runware and hasattr(self, "_runware_connected"):
-                # Note: Runware SDK doesn't have explicit disconnect, but we can reset the flag
-                delattr(self, "_runware_connected")
-            loop.close()
-
-        print(
-            f"     - Successfully processed {successful_replacements}/{len(placeholders)} images"
+        self.logger.info(
+            "Successfully processed %d/%d images",
+            successful_replacements,
+            len(placeholders),
         )
 
         # CRITICAL: Ensure ALL remaining PLACEHOLDER_IMAGE references are removed
-        remaining_placeholders = updated_content.count("PLACEHOLDER_IMAGE")
-        if remaining_placeholders > 0:
-            print(
-                f"     - WARNING: Found {remaining_placeholders} remaining placeholders, removing them..."
-            )
-            # Remove any remaining placeholder patterns
-            updated_content = re.sub(
-                r"!\[[^\]]*\]\(PLACEHOLDER_IMAGE\)", "", updated_content
+        # (remove and count in a single pass)
+        updated_content, remaining_placeholders = _PLACEHOLDER_RE.subn(
+            "", updated_content
+        )
+        if remaining_placeholders:
+            self.logger.warning(
+                "Removed %d remaining placeholders", remaining_placeholders
             )
-            print(f"     - Cleaned all remaining PLACEHOLDER_IMAGE references")
 
-        # Create updated article
-        article_data = article.model_dump()
-        article_data.update(
-            {"enriched_content": updated_content, "hero_image_url": hero_image_url}
+        # Create updated article (shallow copy, untouched fields are not re-validated)
+        return article.model_copy(
+            update={"enriched_content": updated_content, "hero_image_url": hero_image_url}
         )
-        enhanced_article = EnrichedArticle(**article_data)
 
-        return enhanced_article
+    async def _process_articles(
+        self, articles: List[EnrichedArticle]
+    ) -> List[EnrichedArticle]:
+        """Process articles concurrently, keeping the input order in the result."""
+        image_semaphore = asyncio.Semaphore(self.max_concurrent_images)
+        article_semaphore = asyncio.Semaphore(self.max_concurrent_articles)
+
+        if self.runware:
+            try:
+                await self._ensure_runware_connected()
+            except Exception as e:
+                self.logger.warning("⚠️ Could not connect to Runware: %s", e)
+
+        async def process_one(index: int, article: EnrichedArticle) -> EnrichedArticle:
+            async with article_semaphore:
+                self.logger.info("Processing article %d/%d", index, len(articles))
+                try:
+                    return await self._process_article_images(article, image_semaphore)
+                except Exception as e:
+                    self.logger.error(
+                        "Error processing article images: %s", e, exc_info=True
+                    )
+                    # Keep original article if image processing fails
+                    return article
+
+        try:
+            return list(
+                await asyncio.gather(
+                    *(process_one(i, article) for i, article in enumerate(articles, 1))
+                )
+            )
+        finally:
+            # One SQLite commit per run, off the event loop
+            try:
+                await asyncio.to_thread(self._image_index.flush)
+            except sqlite3.Error as e:
+                self.logger.warning("Could not save the image index: %s", e)
+
+    async def _aclose(self) -> None:
+        """Close the HTTP session and the Runware connection."""
+        await self._close_http_session()
+        if self.runware and self._runware_connected:
+            disconnect = getattr(self.runware, "disconnect", None)
+            if disconnect is not None:
+                try:
+                    await disconnect()
+                except Exception as e:
+                    self.logger.warning("Error disconnecting from Runware: %s", e)
+            self._runware_connected = False
+
+    def close(self) -> None:
+        """Release network resources and the image index. Call once when done."""
+        try:
+            if self._loop is not None and not self._loop.is_closed():
+                try:
+                    self._loop.run_until_complete(self._aclose())
+                finally:
+                    self._loop.close()
+                    self._loop = None
+                    self._runware_lock = None
+        finally:
+            self._image_index.close()
 
     def run(self, state: AgentState) -> AgentState:
         """Add relevant images to enriched articles."""
 
-        print("ArticleImageGeneratorAgent: Starting to generate images for articles...")
+        self.logger.info(
+            "ArticleImageGeneratorAgent: Starting to generate images for articles..."
+        )
 
         if self.use_ai_generation:
-            print("   - Using AI image generation (Runware) with Pixabay fallback")
+            self.logger.info("Using AI image generation (Runware) with Pixabay fallback")
         else:
-            print("   - Using Pixabay only (AI generation disabled)")
+            self.logger.info("Using Pixabay only (AI generation disabled)")
 
         if not state.enriched_articles:
-            print("ArticleImageGeneratorAgent: No enriched articles to process.")
+            self.logger.info("ArticleImageGeneratorAgent: No enriched articles to process.")
             return state
 
         if not self.pixabay_api_key:
-            print(
+            self.logger.warning(
                 "ArticleImageGeneratorAgent: No Pixabay API key provided. Skipping image generation."
             )
             return state
 
-        print(
-            f"ArticleImageGeneratorAgent: Processing {len(state.enriched_articles)} articles..."
+        self.logger.info(
+            "ArticleImageGeneratorAgent: Processing %d articles...",
+            len(state.enriched_articles),
         )
 
-        enhanced_articles = []
-
-        for i, article in enumerate(state.enriched_articles, 1):
-            print(f"\n   - Processing article {i}/{len(state.enriched_articles)}")
-            try:
-                enhanced_article = self._process_article_images(article)
-                enhanced_articles.append(enhanced_article)
-
-            except Exception as e:
-                print(f"     - Error processing article images: {e}")
-                import traceback
-
-                traceback.print_exc()
-                # Keep original article if image processing fails
-                enhanced_articles.append(article)
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+        enhanced_articles = self._loop.run_until_complete(
+            self._process_articles(state.enriched_articles)
+        )
 
         state.enriched_articles = enhanced_articles
-        print(
-            f"\nArticleImageGeneratorAgent: Completed image processing for {len(enhanced_articles)} articles"
+        self.logger.info(
+            "ArticleImageGeneratorAgent: Completed image processing for %d articles",
+            len(enhanced_articles),
         )
 
         return state
@@ -536,6 +1050,7 @@ if __name__ == "__main__":
 
     print("--- Testing ArticleImageGeneratorAgent in isolation ---")
     load_dotenv()
+    logging.basicConfig(level=logging.DEBUG)
 
     # Get API keys from environment
     pixabay_key = os.getenv("PIXABAY_API_KEY")
@@ -606,7 +1121,10 @@ This initiative represents Finland's commitment to technological advancement."""
     )
 
     print("\n--- Running ArticleImageGeneratorAgent ---")
-    result_state = image_agent.run(test_state)
+    try:
+        result_state = image_agent.run(test_state)
+    finally:
+        image_agent.close()
     print("--- Agent completed ---")
 
     # Print results
@@ -2,147 +2,169 @@ from agents.base_agent import BaseAgent
 from schemas.agent_state import AgentState
 from schemas.enriched_article import EnrichedArticle
 import psycopg
-import datetime
-import sys
+import logging
+import os
+from typing import Optional
+
+from psycopg_pool import ConnectionPool
 
 from services.editor_review_service import EditorialReviewService
 
+logger = logging.getLogger(__name__)
+
+# Kept as plain str constants (not sql.SQL, which psycopg would have to
+# re-render on every execute) so the driver sees identical query text on
+# every call and reuses the server-side prepared statement for it.
+_REJECT_ARTICLE_SQL = """
+    UPDATE news_article
+    SET
+        status = 'rejected',
+        updated_at = now()
+    WHERE id = %s
+    RETURNING id, status, updated_at
+"""
+
+_VERIFY_REJECT_SQL = "SELECT status FROM news_article WHERE id = %s"
+
 
 class ArticleRejectAgent(BaseAgent):
     """Agent that handles rejected articles by updating their status and saving rejection review."""
 
-    def __init__(self, db_dsn: str):
+    def __init__(
+        self,
+        db_dsn: str,
+        editorial_service: Optional[EditorialReviewService] = None,
+    ):
         super().__init__(llm=None, prompt=None, name="ArticleRejectAgent")
         self.db_dsn = db_dsn
-        self.editorial_service = EditorialReviewService(db_dsn)
+        # Prefer the application-wide service so rejections share its pool
+        if editorial_service is None:
+            # prepare_threshold lets psycopg switch the repeated UPDATE to a
+            # server-side prepared statement.
+            pool = ConnectionPool(
+                db_dsn,
+                min_size=1,
+                max_size=8,
+                kwargs={"prepare_threshold": 5},
+                open=True,
+            )
+            editorial_service = EditorialReviewService(db_dsn, pool=pool)
+        self.editorial_service = editorial_service
+        self.pool = editorial_service.pool
 
     def run(self, state: AgentState) -> AgentState:
         """Updates the rejected article's status and saves editorial review."""
-        print("🚫 ARTICLE REJECT AGENT: Processing rejected article...", flush=True)
+        logger.info("🚫 ARTICLE REJECT AGENT: Processing rejected article...")
 
-        if not hasattr(state, "current_article") or not state.current_article:
-            print("❌ ArticleRejectAgent: No current_article to reject!", flush=True)
+        if not state.current_article:
+            logger.error("❌ ArticleRejectAgent: No current_article to reject!")
             return state
 
         article: EnrichedArticle = state.current_article
         if not isinstance(article, EnrichedArticle):
-            print(
-                f"❌ ArticleRejectAgent: Expected EnrichedArticle, got {type(article)}",
-                flush=True,
+            logger.error(
+                "❌ ArticleRejectAgent: Expected EnrichedArticle, got %s", type(article)
             )
             return state
 
         if not article.news_article_id:
-            print("❌ ArticleRejectAgent: Article has no news_article_id!", flush=True)
+            logger.error("❌ ArticleRejectAgent: Article has no news_article_id!")
             return state
 
-        enriched_title = getattr(article, "enriched_title", None)
-        original_title = getattr(article, "original_title", None)
-        title_preview = str(enriched_title or original_title or "Unknown title")[:50]
+        title_preview = (article.enriched_title or "Unknown title")[:50]
 
         rejection_reason = self._get_rejection_reason(state)
 
-        print(f"📰 Rejecting article: {title_preview}...", flush=True)
-        print(f"🔢 News Article ID: {article.news_article_id}", flush=True)
-        print(f"   💬 Reason: {rejection_reason}", flush=True)
+        logger.info(
+            "📰 Rejecting article %s: %s... (reason: %s)",
+            article.news_article_id,
+            title_preview,
+            rejection_reason,
+        )
+
+        # Serialize before taking a connection to keep the transaction short
+        review_json = (
+            state.review_result.model_dump_json() if state.review_result else None
+        )
 
         try:
-            with psycopg.connect(self.db_dsn) as conn:
-                conn.autocommit = False
-                try:
-                    rejected_at = datetime.datetime.now(datetime.timezone.utc)
-
-                    cursor = conn.execute(
-                        """
-                        UPDATE news_article
-                        SET 
-                            status = 'rejected',
-                            updated_at = %s
-                        WHERE id = %s
-                        RETURNING id, status
-                        """,
-                        (rejected_at, article.news_article_id),
-                    )
-                    updated_row = cursor.fetchone()
+            with self.editorial_service.connection() as conn:
+                review_error = None
+                review_saved = False
+
+                # Any exception inside the block rolls the whole rejection back
+                with conn.transaction():
+                    updated_row = conn.execute(
+                        _REJECT_ARTICLE_SQL,
+                        (article.news_article_id,),
+                        prepare=True,
+                    ).fetchone()
                     if not updated_row:
-                        print(
-                            f"⚠️  No rows updated - article {article.news_article_id} not found!",
-                            flush=True,
-                        )
-                        conn.rollback()
-                        return state
-
-                    updated_id, updated_status = updated_row
-                    print(
-                        f"✅ Article status updated to '{updated_status}' successfully!",
-                        flush=True,
-                    )
-                    print(f"   🆔 Updated article ID: {updated_id}", flush=True)
-
-                    # IMPORTANT: Commit the article rejection BEFORE saving editorial review
-                    # to avoid cross-connection lock waits if the review saving touches
-                    # related tables (or even news_article in some cases).
-                    conn.commit()
-                    print(f"✅ Transaction committed successfully!", flush=True)
-                    print(
-                        f"   📅 Rejected at: {rejected_at.strftime('%Y-%m-%d %H:%M:%S UTC')}",
-                        flush=True,
-                    )
+                        raise psycopg.Rollback()
 
-                    # Now save the rejection review in a separate connection safely
-                    if hasattr(state, "review_result") and state.review_result:
+                    # The UPDATE has already succeeded; the review runs in its
+                    # own savepoint so a failing review cannot undo the rejection
+                    if state.review_result:
                         try:
-                            print("📝 Saving rejection editorial review...", flush=True)
-                            editorial_review_id = (
+                            with conn.transaction(), conn.cursor() as review_cur:
                                 self.editorial_service.save_editorial_review(
                                     news_article_id=article.news_article_id,
                                     review_data=state.review_result,
+                                    cur=review_cur,
+                                    review_json=review_json,
                                 )
-                            )
-                            print(
-                                f"💾 Rejection review saved (ID: {editorial_review_id})",
-                                flush=True,
-                            )
-                        except Exception as review_error:
-                            print(
-                                f"⚠️ Failed to save editorial review: {review_error}",
-                                flush=True,
-                            )
-
-                except Exception as tx_error:
-                    conn.rollback()
-                    print(f"❌ Transaction failed, rolled back: {tx_error}", flush=True)
-                    import traceback
-
-                    traceback.print_exc()
+                            review_saved = True
+                        except Exception as e:
+                            review_error = e
+
+                if not updated_row:
+                    logger.warning(
+                        "⚠️  No rows updated - article %s not found!",
+                        article.news_article_id,
+                    )
                     return state
 
-        except psycopg.Error as db_error:
-            print(f"❌ Database error in ArticleRejectAgent: {db_error}", flush=True)
-            import traceback
+                updated_id, updated_status, rejected_at = updated_row
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(
+                        "✅ Article %s status updated to '%s' at %s",
+                        updated_id,
+                        updated_status,
+                        rejected_at.isoformat(),
+                    )
+                if review_saved:
+                    logger.info("💾 Rejection review saved (ID: %s)", updated_id)
+                elif review_error is not None:
+                    logger.warning(
+                        "⚠️ Failed to save editorial review: %s", review_error
+                    )
 
-            traceback.print_exc()
+                # RETURNING already proves the write; re-reading the row is
+                # only useful while debugging locally.
+                if os.environ.get("REJECT_AGENT_VERIFY"):
+                    verify_cursor = conn.execute(_VERIFY_REJECT_SQL, (updated_id,))
+                    verified = verify_cursor.fetchone()
+                    logger.info(
+                        "🔍 Verified status: %s",
+                        verified[0] if verified else "missing",
+                    )
+
+        except psycopg.Error as db_error:
+            logger.error(
+                "❌ Database error in ArticleRejectAgent: %s", db_error, exc_info=True
+            )
             return state
 
         except Exception as e:
-            print(f"❌ Unexpected error rejecting article: {e}", flush=True)
-            import traceback
-
-            traceback.print_exc()
+            logger.exception("❌ Unexpected error rejecting article: %s", e)
             return state
 
-        print(f"🔄 ArticleRejectAgent completed, returning state...", flush=True)
-        sys.stdout.flush()
+        logger.debug("🔄 ArticleRejectAgent completed, returning state...")
         return state
 
     def _get_rejection_reason(self, state: AgentState) -> str:
         """Extract rejection reason from review_result."""
-        if hasattr(state, "review_result") and state.review_result:
-            if (
-                hasattr(state.review_result, "editorial_reasoning")
-                and state.review_result.editorial_reasoning
-            ):
-                explanation = state.review_result.editorial_reasoning.explanation
-                if explanation:
-                    return explanation
+        review = state.review_result
+        if review and review.editorial_reasoning.explanation:
+            return review.editorial_reasoning.explanation
         return "Editorial rejection - no specific reason provided"
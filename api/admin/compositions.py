@@ -1,9 +1,12 @@
 # api/admin/compositions.py
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import ORJSONResponse
 import psycopg
+from psycopg.rows import dict_row
 from pydantic import BaseModel
 from typing import List
 
+from agents.editor_in_chief_agent import clear_persona_prompt_cache
 from utils.database import get_db_connection
 
 router = APIRouter()
@@ -11,6 +14,9 @@ router = APIRouter()
 
 # Pydantic model (kopioi server.py:stä)
 class PromptComposition(BaseModel):
+    """Prompt composition; at most one can be active at a time (enforced by the
+    idx_one_active_composition partial unique index)"""
+
     name: str
     ethical_persona_id: int
     fragment_ids: List[int] = []
@@ -20,27 +26,17 @@ class PromptComposition(BaseModel):
 async def get_prompt_compositions():
     """Hae kaikki prompt-kokoonpanot"""
     async with await get_db_connection() as conn:
-        async with conn.cursor() as cur:
+        async with conn.cursor(binary=True, row_factory=dict_row) as cur:
             await cur.execute(
                 """
-                SELECT id, name, ethical_persona_id, fragment_ids, is_active, created_at
+                SELECT id, name, ethical_persona_id,
+                       COALESCE(fragment_ids, '{}') AS fragment_ids,
+                       is_active, created_at
                 FROM prompt_compositions 
                 ORDER BY is_active DESC, created_at DESC
             """
             )
-            rows = await cur.fetchall()
-
-            return [
-                {
-                    "id": row[0],
-                    "name": row[1],
-                    "ethical_persona_id": row[2],
-                    "fragment_ids": row[3] or [],
-                    "is_active": row[4],
-                    "created_at": row[5].isoformat() if row[5] else None,
-                }
-                for row in rows
-            ]
+            return ORJSONResponse(await cur.fetchall())
 
 
 @router.post("/prompt-compositions")
@@ -48,36 +44,16 @@ async def create_prompt_composition(composition: PromptComposition):
     """Luo uusi prompt-kokoonpano"""
     async with await get_db_connection() as conn:
         async with conn.cursor() as cur:
-            # Validate persona exists
-            await cur.execute(
-                """
-                SELECT COUNT(*) FROM prompt_ethical_personas WHERE id = %s
-            """,
-                (composition.ethical_persona_id,),
-            )
-
-            if (await cur.fetchone())[0] == 0:
-                raise HTTPException(status_code=400, detail="Ethical persona not found")
-
-            # Validate fragments exist (if any)
-            if composition.fragment_ids:
-                await cur.execute(
-                    """
-                    SELECT COUNT(*) FROM prompt_fragments WHERE id = ANY(%s)
-                """,
-                    (composition.fragment_ids,),
-                )
-
-                if (await cur.fetchone())[0] != len(composition.fragment_ids):
-                    raise HTTPException(
-                        status_code=400, detail="One or more fragments not found"
-                    )
-
+            # One statement: the persona is checked by its foreign key and the
+            # fragments by the WHERE clause, so no separate validation queries
             try:
                 await cur.execute(
                     """
                     INSERT INTO prompt_compositions (name, ethical_persona_id, fragment_ids, is_active)
-                    VALUES (%s, %s, %s, %s)
+                    SELECT %s, %s, %s, %s
+                    WHERE (
+                        SELECT COUNT(*) FROM prompt_fragments WHERE id = ANY(%s)
+                    ) = cardinality(%s::integer[])
                     RETURNING id
                 """,
                     (
@@ -85,61 +61,72 @@ async def create_prompt_composition(composition: PromptComposition):
                         composition.ethical_persona_id,
                         composition.fragment_ids,
                         False,
+                        composition.fragment_ids,
+                        composition.fragment_ids,
                     ),
                 )
-
-                composition_id = (await cur.fetchone())[0]
-                await conn.commit()
-
-                return {
-                    "message": f"Composition '{composition.name}' created",
-                    "id": composition_id,
-                }
+            except psycopg.errors.ForeignKeyViolation:
+                raise HTTPException(status_code=400, detail="Ethical persona not found")
             except psycopg.IntegrityError:
                 raise HTTPException(
                     status_code=400, detail="Composition name already exists"
                 )
 
+            result = await cur.fetchone()
+            if not result:
+                raise HTTPException(
+                    status_code=400, detail="One or more fragments not found"
+                )
+
+            await conn.commit()
+
+            return {
+                "message": f"Composition '{composition.name}' created",
+                "id": result[0],
+            }
+
 
 @router.put("/prompt-compositions/{composition_id}/activate")
 async def activate_composition(composition_id: int):
     """Aktivoi tietty kokoonpano (deaktivoi muut)"""
     async with await get_db_connection() as conn:
         async with conn.cursor() as cur:
-            # Check composition exists
-            await cur.execute(
-                """
-                SELECT name FROM prompt_compositions WHERE id = %s
-            """,
-                (composition_id,),
-            )
+            # Both updates go out in one pipeline (one round trip). They stay two
+            # statements: a single UPDATE flipping both rows could trip the
+            # one-active-composition unique index depending on row order.
+            try:
+                async with conn.pipeline():
+                    await conn.execute(
+                        """
+                        UPDATE prompt_compositions SET is_active = false, updated_at = NOW()
+                        WHERE is_active = true AND id <> %s
+                    """,
+                        (composition_id,),
+                    )
+                    await cur.execute(
+                        """
+                        UPDATE prompt_compositions 
+                        SET is_active = true, updated_at = NOW()
+                        WHERE id = %s
+                        RETURNING name
+                    """,
+                        (composition_id,),
+                    )
+            except psycopg.errors.UniqueViolation:
+                # Another activation committed in between
+                raise HTTPException(
+                    status_code=409,
+                    detail="Another composition was activated concurrently",
+                )
 
             result = await cur.fetchone()
             if not result:
+                await conn.rollback()
                 raise HTTPException(status_code=404, detail="Composition not found")
 
-            composition_name = result[0]
-
-            # Deactivate all compositions
-            await cur.execute(
-                """
-                UPDATE prompt_compositions SET is_active = false, updated_at = NOW()
-                WHERE is_active = true
-            """
-            )
-
-            # Activate this composition
-            await cur.execute(
-                """
-                UPDATE prompt_compositions 
-                SET is_active = true, updated_at = NOW()
-                WHERE id = %s
-            """,
-                (composition_id,),
-            )
-
             await conn.commit()
-            return {"message": f"Composition '{composition_name}' activated"}
+            clear_persona_prompt_cache()
+            return {"message": f"Composition '{result[0]}' activated"}
 
 
 @router.delete("/prompt-compositions/{composition_id}")
@@ -147,18 +134,15 @@ async def delete_composition(composition_id: int):
     """Poista kokoonpano"""
     async with await get_db_connection() as conn:
         async with conn.cursor() as cur:
-            # Tarkista että kokoonpano on olemassa
+            # Poista kokoonpano; RETURNING kertoo oliko se olemassa
             await cur.execute(
-                "SELECT name FROM prompt_compositions WHERE id = %s", (composition_id,)
+                "DELETE FROM prompt_compositions WHERE id = %s RETURNING name",
+                (composition_id,),
             )
 
             if not await cur.fetchone():
                 raise HTTPException(status_code=404, detail="Composition not found")
 
-            # Poista kokoonpano
-            await cur.execute(
-                "DELETE FROM prompt_compositions WHERE id = %s", (composition_id,)
-            )
-
             await conn.commit()
+            clear_persona_prompt_cache()
             return {"message": "Composition deleted"}
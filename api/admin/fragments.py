@@ -1,11 +1,15 @@
 # api/admin/compositions.py
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import ORJSONResponse
+import logging
 import psycopg
+from psycopg.rows import dict_row
 from pydantic import BaseModel
 
 from utils.database import get_db_connection
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 
 # FRAGMENTS for prompt construction
@@ -19,9 +23,8 @@ class PromptFragment(BaseModel):
 @router.get("/prompt-fragments")
 async def get_prompt_fragments():
     """Hae kaikki prompt-fragmentit"""
-    print("ASDASDASD")
     async with await get_db_connection() as conn:
-        async with conn.cursor() as cur:
+        async with conn.cursor(binary=True, row_factory=dict_row) as cur:
             await cur.execute(
                 """
                 SELECT id, name, content, is_system, created_at 
@@ -30,18 +33,9 @@ async def get_prompt_fragments():
             """
             )
             rows = await cur.fetchall()
-            print(rows)
-
-            return [
-                {
-                    "id": row[0],
-                    "name": row[1],
-                    "content": row[2],
-                    "is_system": row[3],
-                    "created_at": row[4].isoformat() if row[4] else None,
-                }
-                for row in rows
-            ]
+            logger.debug("Fetched %d prompt fragments", len(rows))
+
+            return ORJSONResponse(rows)
 
 
 # CREATE NEW FRAGMENT
@@ -79,47 +73,44 @@ async def delete_prompt_fragment(fragment_id: int):
     """Poista prompt-fragmentti (vain käyttäjän luomat)"""
     async with await get_db_connection() as conn:
         async with conn.cursor() as cur:
-            # Check if fragment exists and is not system
+            # Check and delete in one statement: the row is removed only if it
+            # exists, is not a system fragment and no composition uses it
             await cur.execute(
                 """
-                SELECT is_system FROM prompt_fragments WHERE id = %s
+                WITH target AS (
+                    SELECT id, is_system FROM prompt_fragments WHERE id = %(id)s
+                ),
+                used AS (
+                    SELECT name FROM prompt_compositions WHERE %(id)s = ANY(fragment_ids)
+                ),
+                deleted AS (
+                    DELETE FROM prompt_fragments
+                    WHERE id IN (SELECT id FROM target WHERE is_system IS NOT TRUE)
+                    AND NOT EXISTS (SELECT 1 FROM used)
+                    RETURNING id
+                )
+                SELECT
+                    EXISTS (SELECT 1 FROM target),
+                    (SELECT is_system FROM target),
+                    (SELECT array_agg(name) FROM used)
             """,
-                (fragment_id,),
+                {"id": fragment_id},
             )
 
-            result = await cur.fetchone()
-            if not result:
+            found, is_system, composition_names = await cur.fetchone()
+            if not found:
                 raise HTTPException(status_code=404, detail="Fragment not found")
 
-            if result[0]:  # is_system = True
+            if is_system:
                 raise HTTPException(
                     status_code=403, detail="Cannot delete system fragment"
                 )
 
-            # Check if used in ANY composition
-            await cur.execute(
-                """
-                SELECT name FROM prompt_compositions 
-                WHERE %s = ANY(fragment_ids)
-            """,
-                (fragment_id,),
-            )
-
-            compositions = await cur.fetchall()
-            if compositions:
-                composition_names = [row[0] for row in compositions]
+            if composition_names:
                 raise HTTPException(
                     status_code=400,
                     detail=f"Cannot delete fragment: used in compositions: {', '.join(composition_names)}",
                 )
 
-            # Delete fragment
-            await cur.execute(
-                """
-                DELETE FROM prompt_fragments WHERE id = %s
-            """,
-                (fragment_id,),
-            )
-
             await conn.commit()
             return {"message": "Fragment deleted"}
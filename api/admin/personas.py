@@ -1,6 +1,8 @@
 # api/admin/compositions.py
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import ORJSONResponse
 import psycopg
+from psycopg.rows import dict_row
 from pydantic import BaseModel
 
 from utils.database import get_db_connection
@@ -19,7 +21,7 @@ class EthicalPersona(BaseModel):
 async def get_ethical_personas():
     """Hae kaikki eettiset persoonat"""
     async with await get_db_connection() as conn:
-        async with conn.cursor() as cur:
+        async with conn.cursor(binary=True, row_factory=dict_row) as cur:
             await cur.execute(
                 """
                 SELECT id, name, content, is_system 
@@ -27,17 +29,7 @@ async def get_ethical_personas():
                 ORDER BY is_system DESC, name ASC;
             """
             )
-            rows = await cur.fetchall()
-
-            return [
-                {
-                    "id": row[0],
-                    "name": row[1],
-                    "content": row[2],
-                    "is_system": row[3],
-                }
-                for row in rows
-            ]
+            return ORJSONResponse(await cur.fetchall())
 
 
 # CREATE NEW PERSONA
@@ -75,47 +67,44 @@ async def delete_ethical_persona(persona_id: int):
     """Poista eettinen persoona (vain käyttäjän luomat)"""
     async with await get_db_connection() as conn:
         async with conn.cursor() as cur:
-            # Check if persona exists and is not system
+            # Check and delete in one statement: the row is removed only if it
+            # exists, is not a system persona and no composition uses it
             await cur.execute(
                 """
-                SELECT is_system FROM prompt_ethical_personas WHERE id = %s
+                WITH target AS (
+                    SELECT id, is_system FROM prompt_ethical_personas WHERE id = %(id)s
+                ),
+                used AS (
+                    SELECT name FROM prompt_compositions WHERE ethical_persona_id = %(id)s
+                ),
+                deleted AS (
+                    DELETE FROM prompt_ethical_personas
+                    WHERE id IN (SELECT id FROM target WHERE is_system IS NOT TRUE)
+                    AND NOT EXISTS (SELECT 1 FROM used)
+                    RETURNING id
+                )
+                SELECT
+                    EXISTS (SELECT 1 FROM target),
+                    (SELECT is_system FROM target),
+                    (SELECT array_agg(name) FROM used)
             """,
-                (persona_id,),
+                {"id": persona_id},
             )
 
-            result = await cur.fetchone()
-            if not result:
+            found, is_system, composition_names = await cur.fetchone()
+            if not found:
                 raise HTTPException(status_code=404, detail="Persona not found")
 
-            if result[0]:  # is_system = True
+            if is_system:
                 raise HTTPException(
                     status_code=403, detail="Cannot delete system persona"
                 )
 
-            # Check if used in ANY composition (not just active ones)
-            await cur.execute(
-                """
-                SELECT name FROM prompt_compositions 
-                WHERE ethical_persona_id = %s
-            """,
-                (persona_id,),
-            )
-
-            compositions = await cur.fetchall()
-            if compositions:
-                composition_names = [row[0] for row in compositions]
+            if composition_names:
                 raise HTTPException(
                     status_code=400,
                     detail=f"Cannot delete persona: used in compositions: {', '.join(composition_names)}",
                 )
 
-            # Delete persona
-            await cur.execute(
-                """
-                DELETE FROM prompt_ethical_personas WHERE id = %s
-            """,
-                (persona_id,),
-            )
-
             await conn.commit()
             return {"message": "Persona deleted"}
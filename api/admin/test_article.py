@@ -1,30 +1,127 @@
 # api/admin/test_article.py
 from fastapi import APIRouter
-from pydantic import BaseModel
-from typing import Dict, Any, Optional
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, model_validator
+from typing import Dict, Any, List, Optional, Tuple
+from collections import OrderedDict
+from functools import lru_cache
+import asyncio
+import hashlib
+import json
 import logging
 import os
+import re
 from langchain.chat_models import init_chat_model
+from openai import DefaultAsyncHttpxClient
+from psycopg_pool import ConnectionPool
 
-from agents.editor_in_chief_agent import EditorInChiefAgent
+from agents.editor_in_chief_agent import EditorInChiefAgent, is_phone_interview_time
 from schemas.agent_state import AgentState
+from schemas.editor_in_chief_schema import ReviewedNewsItem
 from schemas.enriched_article import EnrichedArticle
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Käytä OIKEAA tietokantaa (hakee persoonan)
+# Toimii sekä tuotannossa että kehityksessä
+DATABASE_URL = f"postgresql://{os.getenv('DB_USER', 'news')}:{os.getenv('DB_PASSWORD', 'news')}@{os.getenv('DB_HOST', 'localhost')}:{os.getenv('DB_PORT', '5432')}/{os.getenv('DB_NAME', 'newsroom')}"
+
+# Shared by every test request for the persona lookup (closed in server.py lifespan)
+_db_pool: Optional[ConnectionPool] = None
+
+
+def _get_db_pool() -> ConnectionPool:
+    global _db_pool
+    if _db_pool is None:
+        _db_pool = ConnectionPool(DATABASE_URL, min_size=1, max_size=8, open=True)
+    return _db_pool
+
+
+def close_db_pool() -> None:
+    global _db_pool
+    if _db_pool is not None:
+        _db_pool.close()
+        _db_pool = None
+
+
+# Mock editorial service (ei tallenna reviewia tietokantaan)
+class MockEditorialReviewService:
+    def __init__(self, db_dsn):
+        self.db_dsn = db_dsn
+        logger.debug("🎭 MockEditorialReviewService initialized (test mode)")
+
+    def save_review(self, news_article_id, review_result):
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "🎭 TEST MODE: skip save id=%s status=%s decision=%s",
+                news_article_id,
+                review_result.status,
+                review_result.editorial_decision,
+            )
+        return True
+
+
+# Stateless, so one instance serves every test request
+_MOCK_REVIEW_SERVICE = MockEditorialReviewService(DATABASE_URL)
+
+
+@lru_cache(maxsize=4)
+def _get_llm(model_name: str):
+    """One chat model client per model name, shared by all requests.
+
+    The routes only await the model, so its async client speaks HTTP/2 and
+    concurrent reviews multiplex over one TLS connection to OpenAI. Use it
+    from async routes only: the shared async client is bound to uvicorn's
+    event loop, and sync calls would not go through it.
+    """
+    return init_chat_model(
+        model_name,
+        model_provider="openai",
+        http_async_client=DefaultAsyncHttpxClient(http2=True),
+    )
+
+
+@lru_cache(maxsize=4)
+def _get_structured_llm(model_name: str):
+    """ReviewedNewsItem output binding, built once per model instead of per agent.
+
+    Wraps the client from _get_llm, so it is for async routes only as well.
+    """
+    return _get_llm(model_name).with_structured_output(ReviewedNewsItem)
+
+
+# Longer test articles are rejected before any LLM call
+MAX_ARTICLE_CHARS = 50_000
+
+
 class SimpleArticleTest(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     title: str = "Testiotsikko"
-    content: Optional[str] = None
-    article: Optional[str] = None
-    
-    def get_article_content(self) -> str:
-        return self.content or self.article or ""
-    
-    def __init__(self, **data):
-        super().__init__(**data)
-        if not self.content and not self.article:
+    # Length limits are enforced by pydantic-core itself, in the same pass
+    content: Optional[str] = Field(default=None, max_length=MAX_ARTICLE_CHARS)
+    article: Optional[str] = Field(default=None, max_length=MAX_ARTICLE_CHARS)
+
+    _resolved_content: str = PrivateAttr(default="")
+    _summary: str = PrivateAttr(default="")
+
+    @model_validator(mode="after")
+    def _resolve_content(self) -> "SimpleArticleTest":
+        content = self.content or self.article
+        if not content:
             raise ValueError("Either 'content' or 'article' field is required")
+        self._resolved_content = content
+        self._summary = content[:200] + "..." if len(content) > 200 else content
+        return self
+
+    def get_article_content(self) -> str:
+        return self._resolved_content
+
+
+class BatchArticleTest(BaseModel):
+    articles: List[SimpleArticleTest] = Field(..., min_length=1, max_length=50)
+
 
 class TestArticleResponse(BaseModel):
     status: str
@@ -38,124 +135,331 @@ class TestArticleResponse(BaseModel):
     prompt_used: Optional[str] = None
     model: Optional[str] = None
 
+
+# Successful reviews of earlier test payloads, so resubmits skip the OpenAI call.
+# The prompt embeds the current time, so an LLM-level cache would never hit.
+# exact key -> (context key, normalized embedding or None, response)
+_REVIEW_CACHE: "OrderedDict[str, Tuple[str, Any, TestArticleResponse]]" = OrderedDict()
+_REVIEW_CACHE_SIZE = 128
+
+# Near-duplicate articles (cosine similarity >= threshold) reuse a cached review
+SEMANTIC_CACHE_THRESHOLD = 0.95
+
+
+def _review_cache_key(*parts: str) -> str:
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+@lru_cache(maxsize=1)
+def _get_embedding_model():
+    """Local embedding model for the semantic cache, or None if unavailable"""
+    try:
+        from sentence_transformers import SentenceTransformer
+
+        # Same model as NewsStorerAgent / ArticlePublisherAgent
+        return SentenceTransformer("paraphrase-multilingual-MiniLM-L12-v2")
+    except Exception as e:
+        logger.warning("Semantic review cache disabled: %s", e)
+        return None
+
+
+def _embed_article(title: str, content: str):
+    model = _get_embedding_model()
+    if model is None:
+        return None
+    return model.encode(" ".join(f"{title} {content}".split()), normalize_embeddings=True)
+
+
+def _cache_lookup(
+    exact_key: str, context_key: str, embedding
+) -> Optional[TestArticleResponse]:
+    entry = _REVIEW_CACHE.get(exact_key)
+    if entry is None and embedding is not None:
+        # Only reviews made with the same model, persona and interview window qualify
+        best = SEMANTIC_CACHE_THRESHOLD
+        for key, candidate in _REVIEW_CACHE.items():
+            if candidate[0] != context_key or candidate[1] is None:
+                continue
+            similarity = float(embedding @ candidate[1])
+            if similarity >= best:
+                best, exact_key, entry = similarity, key, candidate
+    if entry is None:
+        return None
+    _REVIEW_CACHE.move_to_end(exact_key)
+    return entry[2]
+
+
+def _cache_store(
+    exact_key: str, context_key: str, embedding, response: TestArticleResponse
+) -> None:
+    _REVIEW_CACHE[exact_key] = (context_key, embedding, response)
+    if len(_REVIEW_CACHE) > _REVIEW_CACHE_SIZE:
+        _REVIEW_CACHE.popitem(last=False)
+
+
+# Constant response for a run that produced no review - built once, not per request
+_NO_REVIEW_RESPONSE = TestArticleResponse(
+    status="error",
+    editorial_decision="unknown",
+    featured=False,
+    interview_needed=False,
+    issues_count=0,
+    reasoning="Ei tulosta",
+    message="Arviointi epäonnistui - ei review_result",
+)
+
+
+# Canned answer for inputs too small to be an article - no LLM call needed
+_MIN_ARTICLE_CHARS = 50
+_WORD_RE = re.compile(r"\w{3,}")
+_INSUFFICIENT_CONTENT_RESPONSE = TestArticleResponse(
+    status="success",
+    editorial_decision="insufficient_content",
+    featured=False,
+    interview_needed=False,
+    issues_count=0,
+    reasoning=f"Artikkeli on liian lyhyt arvioitavaksi (alle {_MIN_ARTICLE_CHARS} merkkiä)",
+    message="Arviointi ohitettu - liian vähän sisältöä",
+)
+
+
+def _can_skip_llm(content: str) -> Optional[TestArticleResponse]:
+    """Return the canned response if content is obviously not a reviewable article"""
+    if len(content) < _MIN_ARTICLE_CHARS or not _WORD_RE.search(content):
+        return _INSUFFICIENT_CONTENT_RESPONSE
+    return None
+
+
+def _build_test_article(request: SimpleArticleTest) -> EnrichedArticle:
+    """Luo test article.
+
+    Every field except title/content is a literal and the request is already
+    validated, so skip EnrichedArticle validation with model_construct.
+    """
+    return EnrichedArticle.model_construct(
+        article_id="test-simple",
+        canonical_news_id=999,
+        news_article_id=999,
+        enriched_title=request.title,
+        enriched_content=request._resolved_content,
+        published_at="2024-01-01T10:00:00Z",
+        source_domain="test.fi",
+        keywords=[],
+        categories=["Yleinen"],
+        language="fi",
+        sources=["https://test.fi/original"],
+        references=[],
+        locations=[],
+        summary=request._summary,
+        enrichment_status="success",
+        original_article_type="news",
+        contacts=[],
+    )
+
+
+def _create_editor_agent(model_name: str) -> EditorInChiefAgent:
+    """EditorInChiefAgent that reads the real persona but never saves reviews.
+
+    Builds the sync pool and may query the persona, so routes run it in a thread.
+    """
+    # Luo EditorInChiefAgent mock-palvelulla (ei tallenna tietokantaan)
+    # Se hakee persoonan tietokannasta _get_active_persona_prompt() metodilla
+    return EditorInChiefAgent(
+        _get_llm(model_name),
+        DATABASE_URL,
+        editorial_service=_MOCK_REVIEW_SERVICE,
+        pool=_get_db_pool(),
+        structured_llm=_get_structured_llm(model_name),
+    )
+
+
+def _review_to_response(
+    review: ReviewedNewsItem, editor_agent: EditorInChiefAgent, model_name: str
+) -> TestArticleResponse:
+    # Kaikki nämä kentät ovat ReviewedNewsItemissä pakollisia
+    return TestArticleResponse(
+        status="success",
+        editorial_decision=review.editorial_decision,
+        featured=review.headline_news_assessment.featured,
+        interview_needed=review.interview_decision.interview_needed,
+        issues_count=len(review.issues),
+        reasoning=review.editorial_reasoning.explanation or "Ei perusteluja",
+        message="Arviointi valmis",
+        review=review.model_dump(),
+        prompt_used=editor_agent.active_prompt,
+        model=model_name,
+    )
+
+
+def _error_response(reasoning: str, message: str) -> TestArticleResponse:
+    return TestArticleResponse(
+        status="error",
+        editorial_decision="error",
+        featured=False,
+        interview_needed=False,
+        issues_count=0,
+        reasoning=reasoning,
+        message=message,
+    )
+
+
+def _json_response(payload) -> ORJSONResponse:
+    """Serialize already-validated response models straight to orjson.
+
+    Returning a Response makes FastAPI skip re-validating it against the
+    route's response_model, which is kept for the OpenAPI docs.
+    """
+    if isinstance(payload, list):
+        return ORJSONResponse([item.model_dump(mode="json") for item in payload])
+    return ORJSONResponse(payload.model_dump(mode="json"))
+
+
 @router.post("/test-article-simple", response_model=TestArticleResponse)
 async def test_article_simple(request: SimpleArticleTest):
     """Testaa artikkelia EditorInChiefAgent:illa"""
+    return _json_response(await _review_test_article(request))
+
+
+async def _review_test_article(request: SimpleArticleTest) -> TestArticleResponse:
+    canned = _can_skip_llm(request._resolved_content)
+    if canned is not None:
+        return canned
+
     try:
         model_name = "gpt-4o-mini"
-        llm = init_chat_model(model_name, model_provider="openai")
-        content = request.get_article_content()
-
-        # Luo test article
-        test_article = EnrichedArticle(
-            article_id="test-simple",
-            canonical_news_id=999,
-            news_article_id=999,
-            enriched_title=request.title,
-            enriched_content=content,
-            published_at="2024-01-01T10:00:00Z",
-            source_domain="test.fi",
-            keywords=[],
-            categories=["Yleinen"],
-            language="fi",
-            sources=["https://test.fi/original"],
-            references=[],
-            locations=[],
-            summary=(content[:200] + "..." if len(content) > 200 else content),
-            enrichment_status="success",
-            original_article_type="news",
-            contacts=[],
-        )
+        test_article = _build_test_article(request)
 
-        initial_state = AgentState(
+        initial_state = AgentState.model_construct(
             current_article=test_article,
             enriched_articles=[test_article],
             reviewed_articles=[],
             review_result=None,
         )
 
-        # Käytä OIKEAA tietokantaa (hakee persoonan)
-        # Toimii sekä tuotannossa että kehityksessä
-        DATABASE_URL = f"postgresql://{os.getenv('DB_USER', 'news')}:{os.getenv('DB_PASSWORD', 'news')}@{os.getenv('DB_HOST', 'localhost')}:{os.getenv('DB_PORT', '5432')}/{os.getenv('DB_NAME', 'newsroom')}"
-        
-        # Mock editorial service (ei tallenna reviewia tietokantaan)
-        class MockEditorialReviewService:
-            def __init__(self, db_dsn): 
-                self.db_dsn = db_dsn
-                logger.info("🎭 MockEditorialReviewService initialized (test mode)")
-            
-            def save_review(self, news_article_id, review_result): 
-                logger.info(f"🎭 TEST MODE: Skipping database save for test article (id={news_article_id})")
-                logger.info(f"   Status: {review_result.status}")
-                logger.info(f"   Decision: {getattr(review_result, 'editorial_decision', 'N/A')}")
-                return True
-
         try:
-            # Luo EditorInChiefAgent normaalisti
-            # Se hakee persoonan tietokannasta _get_active_persona_prompt() metodilla
-            editor_agent = EditorInChiefAgent(llm, DATABASE_URL)
-            
-            # Vaihda VAIN editorial service mockiksi (ei tallenna tietokantaan)
-            editor_agent.editorial_service = MockEditorialReviewService(DATABASE_URL)
-            
+            editor_agent = await asyncio.to_thread(_create_editor_agent, model_name)
+
+            # Same model, persona, interview window and article -> same review
+            context_key = _review_cache_key(
+                model_name,
+                editor_agent.active_prompt,
+                str(is_phone_interview_time()),
+            )
+            exact_key = _review_cache_key(
+                context_key, request.title, request._resolved_content
+            )
+            embedding = None
+            if exact_key not in _REVIEW_CACHE:
+                embedding = await asyncio.to_thread(
+                    _embed_article, request.title, request._resolved_content
+                )
+            cached = _cache_lookup(exact_key, context_key, embedding)
+            if cached is not None:
+                logger.info("Returning cached review for identical or similar test article")
+                return cached
+
             # Aja arviointi
-            result_state = editor_agent.run(initial_state)
+            result_state = await editor_agent.arun(initial_state)
 
-            review = getattr(result_state, "review_result", None)
+            review = result_state.review_result
             if review:
-                review_dict = review.model_dump() if hasattr(review, 'model_dump') else {}
-
-                featured = bool(getattr(getattr(review, "headline_news_assessment", None), "featured", False))
-                interview_needed = bool(getattr(getattr(review, "interview_decision", None), "interview_needed", False))
-                issues_count = len(getattr(review, "issues", []) or [])
-                er = getattr(review, "editorial_reasoning", None)
-                reasoning = getattr(er, "explanation", None) or "Ei perusteluja"
-                decision = getattr(review, "editorial_decision", "unknown")
-
-                return TestArticleResponse(
-                    status="success",
-                    editorial_decision=decision,
-                    featured=featured,
-                    interview_needed=interview_needed,
-                    issues_count=issues_count,
-                    reasoning=reasoning,
-                    message="Arviointi valmis",
-                    review=review_dict,
-                    prompt_used=getattr(editor_agent, "active_prompt", None),
-                    model=model_name,
-                )
+                response = _review_to_response(review, editor_agent, model_name)
+                _cache_store(exact_key, context_key, embedding, response)
+                return response
             else:
                 logger.warning("No review_result in state after editor run")
-                return TestArticleResponse(
-                    status="error",
-                    editorial_decision="unknown",
-                    featured=False,
-                    interview_needed=False,
-                    issues_count=0,
-                    reasoning="Ei tulosta",
-                    message="Arviointi epäonnistui - ei review_result",
-                )
+                return _NO_REVIEW_RESPONSE
 
         except Exception as e:
-            logger.error(f"Error during editor agent run: {str(e)}", exc_info=True)
-            return TestArticleResponse(
-                status="error",
-                editorial_decision="error",
-                featured=False,
-                interview_needed=False,
-                issues_count=0,
-                reasoning=f"Virhe agentin ajossa: {str(e)}",
-                message="Tekninen virhe agentissa",
+            logger.error("Error during editor agent run: %s", e, exc_info=True)
+            return _error_response(
+                f"Virhe agentin ajossa: {e}", "Tekninen virhe agentissa"
             )
 
     except Exception as e:
-        logger.error(f"Virhe artikkeliarviossa: {str(e)}", exc_info=True)
-        return TestArticleResponse(
-            status="error",
-            editorial_decision="error",
-            featured=False,
-            interview_needed=False,
-            issues_count=0,
-            reasoning=f"Virhe: {str(e)}",
-            message="Tekninen virhe",
-        )
\ No newline at end of file
+        logger.error("Virhe artikkeliarviossa: %s", e, exc_info=True)
+        return _error_response(f"Virhe: {e}", "Tekninen virhe")
+
+
+@router.post("/test-article-batch", response_model=List[TestArticleResponse])
+async def test_article_batch(request: BatchArticleTest):
+    """Testaa useita artikkeleita rinnakkain (max 10 LLM-kutsua kerrallaan)"""
+    return _json_response(await _review_test_articles(request))
+
+
+async def _review_test_articles(
+    request: BatchArticleTest,
+) -> List[TestArticleResponse]:
+    model_name = "gpt-4o-mini"
+    responses: List[TestArticleResponse] = [
+        _can_skip_llm(article._resolved_content) for article in request.articles
+    ]
+    # Vain ne artikkelit, jotka oikeasti tarvitsevat LLM-arvion
+    to_review = {
+        i: AgentState.model_construct(current_article=_build_test_article(article))
+        for i, article in enumerate(request.articles)
+        if responses[i] is None
+    }
+    if not to_review:
+        return responses
+
+    try:
+        editor_agent = await asyncio.to_thread(_create_editor_agent, model_name)
+        await editor_agent.abatch(list(to_review.values()), max_concurrency=10)
+    except Exception as e:
+        logger.error("Virhe eräarviossa: %s", e, exc_info=True)
+        error = _error_response(f"Virhe: {e}", "Tekninen virhe")
+        for i in to_review:
+            responses[i] = error
+        return responses
+
+    for i, state in to_review.items():
+        responses[i] = (
+            _review_to_response(state.review_result, editor_agent, model_name)
+            if state.review_result
+            else _NO_REVIEW_RESPONSE
+        )
+    return responses
+
+
+def _sse(payload: Dict[str, Any]) -> str:
+    return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+
+@router.post("/test-article-simple/stream")
+async def test_article_simple_stream(request: SimpleArticleTest):
+    """Testaa artikkelia ja striimaa arvio SSE-tapahtumina.
+
+    Emits ``{"text": ...}`` events with the review JSON as it is generated,
+    then one ``{"result": TestArticleResponse}`` event and ``[DONE]``.
+    """
+    model_name = "gpt-4o-mini"
+    test_article = _build_test_article(request)
+    canned = _can_skip_llm(request._resolved_content)
+
+    async def events():
+        if canned is not None:
+            yield _sse({"result": canned.model_dump(mode="json")})
+            yield "data: [DONE]\n\n"
+            return
+
+        try:
+            editor_agent = await asyncio.to_thread(_create_editor_agent, model_name)
+            state = AgentState.model_construct(current_article=test_article)
+            async for text in editor_agent.astream_review(state):
+                yield _sse({"text": text})
+
+            if state.review_result:
+                response = _review_to_response(
+                    state.review_result, editor_agent, model_name
+                )
+            else:
+                response = _NO_REVIEW_RESPONSE
+        except Exception as e:
+            logger.error("Virhe artikkeliarviossa: %s", e, exc_info=True)
+            response = _error_response(f"Virhe: {e}", "Tekninen virhe")
+
+        yield _sse({"result": response.model_dump(mode="json")})
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
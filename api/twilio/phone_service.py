@@ -1,21 +1,28 @@
 import os
-import json
-import base64
+import re
 import asyncio
+import base64
 import httpx
+import orjson
 import websockets
 import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import BinaryIO, Dict, List, Optional
 from dotenv import load_dotenv
-from itertools import groupby
-from fastapi import APIRouter, FastAPI, WebSocket, Request
+from fastapi import APIRouter, WebSocket, Request
 from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.websockets import WebSocketDisconnect
+from websockets.exceptions import ConnectionClosedOK
+from websockets.protocol import State
 from starlette.websockets import WebSocketState
 from twilio.twiml.voice_response import VoiceResponse, Connect
-from twilio.rest import Client
 from datetime import datetime
 
-from utils.interview_processor import process_call_ended
+from utils.database import get_db_pool
+from utils.interview_processor import schedule_enrichment
 
 router = APIRouter()
 
@@ -45,35 +52,291 @@ TRANSCRIPTION_PROMPT = (
     "Jos jokin sana on epäselvä, merkitse se selvästi esimerkiksi '(epäselvä)'."
 )
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-twilio_client = Client(os.getenv("TWILIO_ACCOUNT_SID"), os.getenv("TWILIO_AUTH_TOKEN"))
+TWILIO_ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID")
+TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN")
 LOCALTUNNEL_URL = os.getenv("LOCALTUNNEL_URL")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_REALTIME_URL = (
+    "wss://api.openai.com/v1/realtime?model=gpt-4o-mini-realtime-preview-2024-12-17"
+)
+# Pre-opened OpenAI sockets kept ready for the next call, and how long they may idle
+OPENAI_WS_POOL_SIZE = int(os.getenv("OPENAI_WS_POOL_SIZE", "2"))
+OPENAI_WS_MAX_IDLE = 30.0
 VOICE = "shimmer"
+# Voices the realtime API accepts; anything else falls back by language
+SUPPORTED_VOICES = frozenset(
+    {"alloy", "ash", "ballad", "coral", "echo", "sage", "shimmer", "verse"}
+)
 
-# Stream-specific phone scripts
-stream_phone_scripts = {}
-stream_article_ids = {}
-
-LOG_EVENT_TYPES = [
-    "error",
-    "response.content.done",
-    "rate_limits.updated",
-    "response.done",
-    "input_audio_buffer.committed",
-    "input_audio_buffer.speech_stopped",
-    "input_audio_buffer.speech_started",
-    "session.created",
-    "session.updated",
-]
 SHOW_TIMING_MATH = False
 
-conversation_logs = {}
-stream_to_call = {}
-call_to_article = {}
-stream_to_article = {}
+LOG_DIR = "conversations_log"
+# Set once LOG_DIR is known to exist, so later calls skip the makedirs stat
+_log_dir_ready = False
+
+
+def _ensure_log_dir() -> None:
+    global _log_dir_ready
+    if not _log_dir_ready:
+        os.makedirs(LOG_DIR, exist_ok=True)
+        _log_dir_ready = True
+
+
+def _open_call_log(log_name: str) -> BinaryIO:
+    """Open the call's NDJSON log for appending (blocking; run it in a thread)."""
+    _ensure_log_dir()
+    return open(os.path.join(LOG_DIR, f"conversation_log_{log_name}.ndjson"), "ab")
+
+
+# Max serialized messages buffered per direction of a media stream
+STREAM_QUEUE_SIZE = 64
+# Twilio sends 20 ms µ-law frames; forward them to OpenAI 100 ms at a time
+MEDIA_FRAMES_PER_APPEND = 5
+
+# Assistant phrases that mean the interview is over, matched in one regex pass
+END_RE = re.compile(
+    "|".join(
+        map(
+            re.escape,
+            [
+                "kiitos haastattelusta",
+                "hyvää päivänjatkoa",
+                "haastattelu päättyi kiitos",
+                "nämä olivat kaikki kysymykset",
+            ],
+        )
+    ),
+    re.IGNORECASE,
+)
+
+# input_audio_buffer.append around a base64 payload (base64 never needs JSON escaping)
+AUDIO_APPEND_PREFIX = b'{"type":"input_audio_buffer.append","audio":"'
+AUDIO_APPEND_SUFFIX = b'"}'
+
+AI_RESPONSE_DONE_MESSAGE = orjson.dumps({"event": "ai_response_done"}).decode()
+
+
+# Twilio REST calls go through one pooled async client so they never block the loop
+_twilio_http: Optional[httpx.AsyncClient] = None
+
+
+def _get_twilio_http() -> httpx.AsyncClient:
+    global _twilio_http
+    if _twilio_http is None:
+        _twilio_http = httpx.AsyncClient(
+            base_url=f"https://api.twilio.com/2010-04-01/Accounts/{TWILIO_ACCOUNT_SID}",
+            auth=(TWILIO_ACCOUNT_SID or "", TWILIO_AUTH_TOKEN or ""),
+            http2=True,
+            timeout=10.0,
+        )
+    return _twilio_http
+
+
+async def close_twilio_http():
+    """Close the Twilio REST client (called on app shutdown)."""
+    global _twilio_http
+    if _twilio_http is not None:
+        await _twilio_http.aclose()
+        _twilio_http = None
+
+
+async def _create_call(to: str, from_: str) -> str:
+    """Dial ``to`` via the Twilio REST API and return the new call SID."""
+    response = await _get_twilio_http().post(
+        "/Calls.json",
+        data={"To": to, "From": from_, "Url": f"{LOCALTUNNEL_URL}/incoming-call"},
+    )
+    response.raise_for_status()
+    return orjson.loads(response.content)["sid"]
+
+
+async def _complete_call(call_sid: str) -> None:
+    """Hang up an ongoing call via the Twilio REST API."""
+    response = await _get_twilio_http().post(
+        f"/Calls/{call_sid}.json", data={"Status": "completed"}
+    )
+    response.raise_for_status()
+
+
+async def _iter_raw_messages(ws):
+    """Like ``async for message in ws``, but yields undecoded bytes.
+
+    OpenAI events are JSON parsed by orjson from bytes, so the per-frame
+    UTF-8 decode/validation of text frames is skipped entirely.
+    """
+    try:
+        while True:
+            yield await ws.recv(decode=False)
+    except ConnectionClosedOK:
+        return
+
+
+async def _iter_twilio_messages(websocket: WebSocket):
+    """Like ``websocket.iter_text()``, but yields frames without decoding them.
+
+    orjson parses both ``bytes`` and ``str``, so binary frames skip the
+    UTF-8 decode and text frames are passed through as delivered.
+    """
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
+        data = message.get("bytes")
+        yield data if data is not None else message["text"]
+
+
+class _StreamEnded(Exception):
+    """Raised when either side of a media stream is done, stopping its TaskGroup."""
+
+
+async def _stop_stream_after(coro):
+    await coro
+    raise _StreamEnded
+
+
+async def _connect_openai():
+    return await websockets.connect(
+        OPENAI_REALTIME_URL,
+        additional_headers={
+            "Authorization": f"Bearer {OPENAI_API_KEY}",
+            "OpenAI-Beta": "realtime=v1",
+        },
+        # base64 µ-law audio does not compress; deflate would only cost CPU
+        compression=None,
+    )
+
+
+async def _close_if_open(ws):
+    # websockets' asyncio connections expose ``state``, not ``open``/``closed``
+    if ws.state is State.OPEN:
+        await ws.close()
+
+
+class OpenAIConnectionPool:
+    """Pre-opens OpenAI realtime sockets so a call skips TCP+TLS+upgrade.
+
+    ``prewarm()`` is called from /incoming-call, while Twilio is still
+    playing the greeting, and the media stream then takes the socket with
+    ``acquire()``. Sessions are configured after checkout. Sockets idle for
+    longer than ``max_idle`` seconds are closed.
+    """
+
+    def __init__(
+        self, size: int = OPENAI_WS_POOL_SIZE, max_idle: float = OPENAI_WS_MAX_IDLE
+    ):
+        self.size = size
+        self.max_idle = max_idle
+        self._idle: list = []  # (socket, opened_at)
+        self._opening = 0
+        self._tasks: set = set()
+
+    def prewarm(self) -> None:
+        """Open one more socket in the background unless the pool is full."""
+        if self.size <= 0 or len(self._idle) + self._opening >= self.size:
+            return
+        self._opening += 1
+        task = asyncio.create_task(self._open_one())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _open_one(self) -> None:
+        try:
+            ws = await _connect_openai()
+        except Exception as e:
+            logger.warning("Could not pre-open OpenAI socket: %s", e)
+            return
+        finally:
+            self._opening -= 1
+        entry = (ws, time.monotonic())
+        self._idle.append(entry)
+        await asyncio.sleep(self.max_idle)
+        if entry in self._idle:
+            self._idle.remove(entry)
+            await ws.close()
+
+    async def acquire(self):
+        """Return a pre-opened socket if one is ready, else connect a new one."""
+        now = time.monotonic()
+        while self._idle:
+            ws, opened_at = self._idle.pop()
+            if now - opened_at <= self.max_idle and ws.state is State.OPEN:
+                logger.info("Using pre-opened OpenAI socket")
+                return ws
+            await ws.close()
+        return await _connect_openai()
+
+    async def close(self) -> None:
+        """Close idle sockets and stop pending opens (called on app shutdown)."""
+        for task in list(self._tasks):
+            task.cancel()
+        while self._idle:
+            ws, _ = self._idle.pop()
+            await ws.close()
+
+
+openai_pool = OpenAIConnectionPool()
+
+
+def _twilio_envelopes(stream_sid):
+    """Pre-serialized (media prefix, media suffix, mark message) for one stream."""
+    sid = orjson.dumps(stream_sid).decode()
+    media_prefix = '{"event":"media","streamSid":' + sid + ',"media":{"payload":"'
+    mark_message = (
+        '{"event":"mark","streamSid":' + sid + ',"mark":{"name":"responsePart"}}'
+    )
+    return media_prefix, '"}}', mark_message
+
+
+@dataclass(slots=True)
+class CallState:
+    """Everything tracked for one interview call, from dial-out to hang-up."""
+
+    call_sid: Optional[str] = None
+    article_id: Optional[int] = None
+    # Serialized session.update for the call's phone script, built when dialing
+    session_update: Optional[bytes] = None
+    # Append-only for the whole call; a deque grows without list resize copies
+    logs: deque = field(default_factory=deque)
+    # "<streamSid>_<timestamp>" naming this call's log files, set when the stream starts
+    log_name: Optional[str] = None
+    # NDJSON copy of ``logs``, appended as the call goes so nothing is dumped at hang-up
+    log_file: Optional[BinaryIO] = None
+    # Encoded lines not yet handed to log_writer
+    log_pending: List[bytes] = field(default_factory=list)
+    # Writes log_pending to log_file in a thread; at most one runs per call
+    log_writer: Optional[asyncio.Task] = None
+    # User transcript logged since the last assistant turn, to skip duplicates
+    last_user_text: Optional[str] = None
+
+    def add_log(self, speaker: str, text: str) -> None:
+        entry = {"speaker": speaker, "text": text}
+        self.logs.append(entry)
+        if self.log_file is None:
+            return
+        # Runs on the media-stream loop, so the disk write goes to a thread
+        self.log_pending.append(orjson.dumps(entry) + b"\n")
+        if self.log_writer is None:
+            self.log_writer = asyncio.create_task(self._write_pending_log())
+
+    async def _write_pending_log(self) -> None:
+        # Keeps writing to this file even if hang-up detaches it meanwhile
+        log_file = self.log_file
+        try:
+            while self.log_pending:
+                data = b"".join(self.log_pending)
+                self.log_pending.clear()
+                await asyncio.to_thread(log_file.write, data)
+        except (OSError, ValueError) as e:
+            logger.warning("Could not append to conversation log %s: %s", self.log_name, e)
+        finally:
+            self.log_writer = None
+
+
+# Calls started via /start-interview or /trigger-call, until their stream starts;
+# from then on the media-stream handler owns the CallState
+calls: Dict[str, CallState] = {}
 
 
 @router.api_route("/incoming-call", methods=["GET", "POST"])
@@ -89,10 +352,12 @@ async def handle_incoming_call(request: Request):
             url=f"{LOCALTUNNEL_URL.replace('https://','wss://')}/media-stream"
         )
         response.append(connect)
+        if OPENAI_API_KEY:
+            openai_pool.prewarm()
         logger.info("Incoming call handled, connecting to media stream")
         return HTMLResponse(content=str(response), media_type="application/xml")
     except Exception as e:
-        logger.error(f"Error handling incoming call: {e}")
+        logger.error("Error handling incoming call: %s", e)
         response = VoiceResponse()
         response.say(
             "Pahoittelemme, puhelun yhdistämisessä tapahtui virhe. Yritä myöhemmin uudelleen.",
@@ -103,10 +368,10 @@ async def handle_incoming_call(request: Request):
 
 @router.post("/start-interview")
 async def start_interview(request: Request):
-    print("\n\n****HAASTATTELU ALKAA!!****")
+    logger.info("****HAASTATTELU ALKAA!!****")
     try:
         body = await request.json()
-        print(f"Received request body: {body}")
+        logger.debug("Received request body: %s", body)
         phone_number = body.get("phone_number")
         phone_script_json = body.get("phone_script_json")
         news_article_id = body.get("article_id")
@@ -132,35 +397,30 @@ async def start_interview(request: Request):
         # Debug logging
         if phone_script_json:
             logger.info("📱 phone_script_json received")
-            logger.info(f"   Voice: {phone_script_json.get('voice', 'not set')}")
-            logger.info(f"   Language: {phone_script_json.get('language', 'not set')}")
+            logger.info("   Voice: %s", phone_script_json.get("voice", "not set"))
+            logger.info("   Language: %s", phone_script_json.get("language", "not set"))
             logger.info(
-                f"   Instructions length: {len(phone_script_json.get('instructions', ''))}"
+                "   Instructions length: %s",
+                len(phone_script_json.get("instructions", "")),
             )
         else:
             logger.info("📱 No phone_script_json - using legacy mode")
-        call = twilio_client.calls.create(
-            to=phone_number,
-            from_=twilio_phone_number,
-            url=f"{LOCALTUNNEL_URL}/incoming-call",
+        call_sid = await _create_call(phone_number, twilio_phone_number)
+        logger.info(
+            "Interview call initiated - SID: %s, To: %s",
+            call_sid,
+            phone_number,
         )
-        logger.info(f"Interview call initiated - SID: {call.sid}, To: {phone_number}")
-        conversation_logs[call.sid] = []
         # Store phone script and article ID for this specific call
-        if phone_script_json:
-            call_to_article[call.sid] = {
-                "article_id": news_article_id,
-                "phone_script": phone_script_json,
-            }
-        elif news_article_id:
-            call_to_article[call.sid] = {
-                "article_id": news_article_id,
-                "phone_script": None,
-            }
+        calls[call_sid] = CallState(
+            call_sid=call_sid,
+            article_id=news_article_id,
+            session_update=_session_update_for(phone_script_json),
+        )
         return JSONResponse(
             content={
                 "status": "success",
-                "call_sid": call.sid,
+                "call_sid": call_sid,
                 "message": f"Interview call initiated to {phone_number}",
                 "to_number": phone_number,
                 "from_number": twilio_phone_number,
@@ -172,7 +432,7 @@ async def start_interview(request: Request):
             }
         )
     except Exception as e:
-        logger.error(f"Error starting interview: {e}")
+        logger.error("Error starting interview: %s", e)
         return JSONResponse(
             status_code=500,
             content={"error": f"Failed to start interview: {str(e)}"},
@@ -199,26 +459,24 @@ async def trigger_call():
                 status_code=400,
                 content={"error": "Missing LOCALTUNNEL_URL environment variable"},
             )
-        call = twilio_client.calls.create(
-            to=to_number,
-            from_=twilio_phone_number,
-            url=f"{LOCALTUNNEL_URL}/incoming-call",
-        )
+        call_sid = await _create_call(to_number, twilio_phone_number)
         logger.info(
-            f"Default call initiated successfully - SID: {call.sid}, To: {to_number}"
+            "Default call initiated successfully - SID: %s, To: %s",
+            call_sid,
+            to_number,
         )
-        conversation_logs[call.sid] = []
+        calls[call_sid] = CallState(call_sid=call_sid)
         return JSONResponse(
             content={
                 "status": "success",
-                "call_sid": call.sid,
+                "call_sid": call_sid,
                 "message": f"Call initiated to {to_number}",
                 "to_number": to_number,
                 "from_number": twilio_phone_number,
             }
         )
     except Exception as e:
-        logger.error(f"Error initiating call: {e}")
+        logger.error("Error initiating call: %s", e)
         return JSONResponse(
             status_code=500, content={"error": f"Failed to initiate call: {str(e)}"}
         )
@@ -237,73 +495,96 @@ async def handle_media_stream(websocket: WebSocket):
     stream_sid = None
     latest_media_timestamp = 0
     last_assistant_item = None
-    mark_queue = []
+    # Marks sent to Twilio and not yet echoed back (only the count matters)
+    pending_marks = 0
     response_start_timestamp_twilio = None
-    call_ended = False
+    # Set once the call is over; waking on it ends the stream's TaskGroup
+    call_ended = asyncio.Event()
     ai_audio_ms_sent = 0
     is_response_active = False
+    call_state: Optional[CallState] = None
+    # Cleared once the Twilio stream stops or disconnects; read on every audio delta
+    ws_connected = True
+    # Per-stream Twilio message envelopes, serialized once on the 'start' event
+    media_prefix = media_suffix = mark_message = None
+    # Serialized outbound messages; writer tasks drain them so a slow peer
+    # back-pressures through the queue instead of stalling the other direction
+    to_openai: asyncio.Queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+    to_twilio: asyncio.Queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
     try:
         logger.info("Connecting to OpenAI Realtime API...")
-        openai_ws = await websockets.connect(
-            "wss://api.openai.com/v1/realtime?model=gpt-4o-mini-realtime-preview-2024-12-17",
-            additional_headers={
-                "Authorization": f"Bearer {OPENAI_API_KEY}",
-                "OpenAI-Beta": "realtime=v1",
-            },
-        )
+        openai_ws = await openai_pool.acquire()
         logger.info("Successfully connected to OpenAI")
-    # Initialize session after Twilio 'start' event so we can include phone_script if available
+    # Initialize session after Twilio 'start' event so the call's phone script is known
 
         async def receive_from_twilio():
-            nonlocal stream_sid, latest_media_timestamp, call_ended, last_assistant_item, response_start_timestamp_twilio
+            nonlocal stream_sid, latest_media_timestamp, last_assistant_item, response_start_timestamp_twilio, media_prefix, media_suffix, mark_message, pending_marks, call_state, ws_connected
             logger.info("Starting receive_from_twilio task")
+            # Decoded µ-law frames not yet forwarded to OpenAI
+            audio_frames = []
+
+            async def flush_audio():
+                if audio_frames:
+                    audio = base64.b64encode(b"".join(audio_frames))
+                    audio_frames.clear()
+                    await to_openai.put(
+                        AUDIO_APPEND_PREFIX + audio + AUDIO_APPEND_SUFFIX
+                    )
+
             try:
-                async for message in websocket.iter_text():
-                    data = json.loads(message)
-                    logger.debug(f"Received Twilio event: {data.get('event')}")
-                    if data["event"] == "media":
-                        if "timestamp" in data["media"]:
-                            latest_media_timestamp = int(data["media"]["timestamp"])
-                        await openai_ws.send(
-                            json.dumps(
-                                {
-                                    "type": "input_audio_buffer.append",
-                                    "audio": data["media"]["payload"],
-                                }
-                            )
+                async for message in _iter_twilio_messages(websocket):
+                    data = orjson.loads(message)
+                    event = data["event"]
+                    # Nearly every frame is media, so it is tested first
+                    if event == "media":
+                        media = data["media"]
+                        timestamp = media.get("timestamp")
+                        if timestamp is not None:
+                            latest_media_timestamp = int(timestamp)
+                        # base64 chunks can't be concatenated as-is (padding)
+                        audio_frames.append(base64.b64decode(media["payload"]))
+                        if len(audio_frames) >= MEDIA_FRAMES_PER_APPEND:
+                            await flush_audio()
+                    elif event == "start":
+                        start = data["start"]
+                        stream_sid = start["streamSid"]
+                        media_prefix, media_suffix, mark_message = (
+                            _twilio_envelopes(stream_sid)
                         )
-                    elif data["event"] == "start":
-                        stream_sid = data["start"]["streamSid"]
-                        logger.info(f"Incoming stream has started {stream_sid}")
+                        logger.info("Incoming stream has started %s", stream_sid)
                         response_start_timestamp_twilio = None
                         latest_media_timestamp = 0
                         last_assistant_item = None
-                        if stream_sid not in conversation_logs:
-                            conversation_logs[stream_sid] = []
-                        call_sid = data["start"].get("callSid")
+                        call_sid = start.get("callSid")
+                        # Phone script and article ID stored when the call was placed
+                        call_state = calls.pop(call_sid, None) or CallState(
+                            call_sid=call_sid
+                        )
+                        call_state.log_name = (
+                            f"{stream_sid}_{time.strftime('%Y%m%d_%H%M%S')}"
+                        )
+                        try:
+                            call_state.log_file = await asyncio.to_thread(
+                                _open_call_log, call_state.log_name
+                            )
+                        except OSError as e:
+                            logger.warning("Conversation log not streamed to disk: %s", e)
                         if call_sid:
-                            stream_to_call[stream_sid] = call_sid
                             logger.info(
-                                f"Linked streamSid {stream_sid} -> callSid {call_sid}"
+                                "Linked streamSid %s -> callSid %s",
+                                stream_sid,
+                                call_sid,
                             )
-                            # Get phone script and article ID for this stream
-                            call_data = call_to_article.get(call_sid, {})
-                            if call_data:
-                                article_id = call_data.get("article_id")
-                                phone_script = call_data.get("phone_script")
-                                if article_id:
-                                    stream_to_article[stream_sid] = article_id
-                                    logger.info(
-                                        f"Linked streamSid {stream_sid} -> article_id {article_id}"
-                                    )
-                                if phone_script:
-                                    stream_phone_scripts[stream_sid] = phone_script
-                                    logger.info(
-                                        f"Stored phone_script for stream {stream_sid}"
-                                    )
+                            if call_state.article_id:
+                                logger.info(
+                                    "Linked streamSid %s -> article_id %s",
+                                    stream_sid,
+                                    call_state.article_id,
+                                )
                             # Initialize session now with stream-specific script (or defaults)
                             await initialize_session(
-                                openai_ws, stream_phone_scripts.get(stream_sid)
+                                openai_ws,
+                                call_state.session_update or DEFAULT_SESSION_UPDATE,
                             )
                         else:
                             logger.warning(
@@ -312,77 +593,89 @@ async def handle_media_stream(websocket: WebSocket):
                         logger.info(
                             "Stream started, waiting for AI to respond based on initial session config."
                         )
-                    elif data["event"] == "stop":
-                        logger.info(f"Stream {stream_sid} has stopped")
-                        call_ended = True
+                    elif event == "stop":
+                        logger.info("Stream %s has stopped", stream_sid)
+                        await flush_audio()
                         try:
-                            call_sid = stream_to_call.get(stream_sid)
+                            call_sid = call_state.call_sid if call_state else None
                             if call_sid:
-                                twilio_client.calls(call_sid).update(status="completed")
+                                await _complete_call(call_sid)
                                 logger.info(
-                                    f"☎️ Puhelu {call_sid} päätetty Twilion päästä"
+                                    "☎️ Puhelu %s päätetty Twilion päästä",
+                                    call_sid,
                                 )
                             else:
                                 logger.warning(
-                                    f"No callSid found for streamSid {stream_sid}; cannot end call via API"
+                                    "No callSid found for streamSid %s; cannot end call via API",
+                                    stream_sid,
                                 )
                         except Exception as e:
-                            logger.error(f"Error ending call via Twilio API: {e}")
+                            logger.error("Error ending call via Twilio API: %s", e)
                         finally:
                             # Defer cleanup to outer finally after logs are saved
-                            pass
+                            call_ended.set()
                         break
-                    elif data["event"] == "mark" and mark_queue:
-                        mark_queue.pop(0)
+                    elif event == "mark" and pending_marks:
+                        pending_marks -= 1
             except WebSocketDisconnect:
                 logger.info("Twilio WebSocket disconnected")
-                if not call_ended:
-                    call_ended = True
+                if not call_ended.is_set():
                     try:
-                        call_sid = stream_to_call.get(stream_sid)
+                        call_sid = call_state.call_sid if call_state else None
                         if call_sid:
-                            twilio_client.calls(call_sid).update(status="completed")
+                            await _complete_call(call_sid)
                             logger.info(
-                                f"☎️ Puhelu {call_sid} päätetty Twilion päästä (WS disconnect)"
+                                "☎️ Puhelu %s päätetty Twilion päästä (WS disconnect)",
+                                call_sid,
                             )
                         else:
                             logger.warning(
-                                f"No callSid mapping for streamSid {stream_sid} on disconnect"
+                                "No callSid mapping for streamSid %s on disconnect",
+                                stream_sid,
                             )
                     except Exception as e:
                         logger.error(
-                            f"Error ending call via Twilio API on disconnect: {e}"
+                            "Error ending call via Twilio API on disconnect: %s",
+                            e,
                         )
                     finally:
                         # Defer cleanup to outer finally after logs are saved
-                        pass
+                        call_ended.set()
             except Exception as e:
-                logger.error(f"Error in receive_from_twilio: {e}")
-                call_ended = True
+                logger.error("Error in receive_from_twilio: %s", e)
+                call_ended.set()
             finally:
+                ws_connected = False
                 logger.info("receive_from_twilio task ending")
 
         async def send_to_twilio():
-            nonlocal stream_sid, last_assistant_item, response_start_timestamp_twilio, call_ended, ai_audio_ms_sent, is_response_active
+            nonlocal stream_sid, last_assistant_item, response_start_timestamp_twilio, ai_audio_ms_sent, is_response_active, pending_marks, ws_connected
             logger.info("Starting send_to_twilio task")
             try:
-                async for openai_message in openai_ws:
-                    if call_ended:
-                        logger.info("Call has ended, stopping send_to_twilio")
-                        break
-                    response = json.loads(openai_message)
+                async for openai_message in _iter_raw_messages(openai_ws):
+                    response = orjson.loads(openai_message)
                     if response.get("type") == "response.created":
                         is_response_active = True
                     if response.get("type") == "session.created":
                         logger.info("OpenAI session created successfully")
-                        logger.info(
-                            f"Session details: {json.dumps(response.get('session', {}), indent=2)}"
-                        )
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug(
+                                "Session details: %s",
+                                orjson.dumps(
+                                    response.get("session", {}),
+                                    option=orjson.OPT_INDENT_2,
+                                ).decode(),
+                            )
                     if response.get("type") == "session.updated":
                         logger.info("🎉 Session updated successfully!")
-                        logger.info(
-                            f"Updated session: {json.dumps(response.get('session', {}), indent=2)}"
-                        )
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug(
+                                "Updated session: %s",
+                                orjson.dumps(
+                                    response.get("session", {}),
+                                    option=orjson.OPT_INDENT_2,
+                                ).decode(),
+                            )
                         logger.info(
                             "📤 Initial response.create sent after session.updated"
                         )
@@ -394,34 +687,30 @@ async def handle_media_stream(websocket: WebSocket):
                             in response.get("error", {}).get("message", "")
                         ):
                             logger.warning(
-                                f"Audio truncation timing error (non-critical): {response}"
+                                "Audio truncation timing error (non-critical): %s",
+                                response,
                             )
                         else:
-                            logger.error(f"OpenAI error: {response}")
+                            logger.error("OpenAI error: %s", response)
                         continue
                     if (
                         response.get("type")
                         == "conversation.item.input_audio_transcription.completed"
                     ):
                         transcript_text = response.get("transcript", "").strip()
-                        if transcript_text and stream_sid in conversation_logs:
-                            logger.info(f"🎤 User: {transcript_text}")
-                            if (
-                                not conversation_logs[stream_sid]
-                                or conversation_logs[stream_sid][-1].get("text")
-                                != transcript_text
-                            ):
-                                conversation_logs[stream_sid].append(
-                                    {"speaker": "user", "text": transcript_text}
-                                )
+                        if transcript_text and call_state is not None:
+                            logger.info("🎤 User: %s", transcript_text)
+                            if transcript_text != call_state.last_user_text:
+                                call_state.last_user_text = transcript_text
+                                call_state.add_log("user", transcript_text)
                     if response.get("type") == "response.done":
                         is_response_active = False
                         response_start_timestamp_twilio = None
                         ai_audio_ms_sent = 0
                         last_assistant_item = None
-                        mark_queue.clear()
+                        pending_marks = 0
                         if SHOW_TIMING_MATH:
-                            print("[DEBUG] response.done received - state reset")
+                            logger.debug("response.done received - state reset")
                         for item in response.get("response", {}).get("output", []):
                             if item.get("type") == "message":
                                 last_assistant_item = item.get("id")
@@ -431,70 +720,56 @@ async def handle_media_stream(websocket: WebSocket):
                                         and "transcript" in part
                                     ):
                                         transcript = part["transcript"]
-                                        end_phrases = [
-                                            "kiitos haastattelusta",
-                                            "hyvää päivänjatkoa",
-                                            "haastattelu päättyi kiitos",
-                                            "nämä olivat kaikki kysymykset",
-                                        ]
-                                        if any(
-                                            phrase in transcript.lower()
-                                            for phrase in end_phrases
-                                        ):
+                                        if END_RE.search(transcript):
                                             logger.info(
-                                                f"🔚 Detected interview end phrase in: {transcript}"
+                                                "🔚 Detected interview end phrase in: %s",
+                                                transcript,
                                             )
                                             await asyncio.sleep(2)
-                                            call_ended = True
                                             logger.info(
                                                 "📞 Ending call after interview completion"
                                             )
+                                            try:
+                                                # Let queued goodbye audio reach Twilio first
+                                                await asyncio.wait_for(
+                                                    to_twilio.join(), timeout=5
+                                                )
+                                            except asyncio.TimeoutError:
+                                                logger.warning(
+                                                    "Twilio queue not drained before hangup"
+                                                )
                                             try:
                                                 if (
                                                     websocket.client_state
                                                     != WebSocketState.DISCONNECTED
                                                 ):
                                                     await websocket.close()
-                                                if hasattr(openai_ws, "closed"):
-                                                    if not openai_ws.closed:
-                                                        await openai_ws.close()
-                                                else:
-                                                    if getattr(
-                                                        openai_ws, "open", False
-                                                    ):
-                                                        await openai_ws.close()
+                                                ws_connected = False
+                                                await _close_if_open(openai_ws)
                                                 logger.info(
                                                     "✅ Call ended successfully"
                                                 )
                                             except Exception as e:
                                                 logger.warning(
-                                                    f"Error closing connections: {e}"
+                                                    "Error closing connections: %s",
+                                                    e,
                                                 )
+                                            call_ended.set()
                                             return
-                                        if (
-                                            transcript
-                                            and stream_sid in conversation_logs
-                                        ):
-                                            conversation_logs[stream_sid].append(
-                                                {
-                                                    "speaker": "assistant",
-                                                    "text": transcript,
-                                                }
-                                            )
-                                        logger.info(f"🤖 Assistant: {transcript}")
+                                        if transcript and call_state is not None:
+                                            call_state.add_log("assistant", transcript)
+                                            call_state.last_user_text = None
+                                        logger.info("🤖 Assistant: %s", transcript)
                     if response.get("type") == "response.audio.delta" and stream_sid:
                         try:
-                            decoded_bytes = base64.b64decode(response["delta"])
-                            audio_payload = base64.b64encode(decoded_bytes).decode(
-                                "utf-8"
-                            )
-                            if websocket.client_state == WebSocketState.CONNECTED:
-                                await websocket.send_json(
-                                    {
-                                        "event": "media",
-                                        "streamSid": stream_sid,
-                                        "media": {"payload": audio_payload},
-                                    }
+                            # Forward the base64 µ-law verbatim; only its length is needed
+                            audio_payload = response["delta"]
+                            padding = audio_payload[-2:].count("=")
+                            decoded_len = len(audio_payload) * 3 // 4 - padding
+                            if ws_connected:
+                                # base64 never needs JSON escaping
+                                await to_twilio.put(
+                                    media_prefix + audio_payload + media_suffix
                                 )
                             else:
                                 logger.info(
@@ -505,47 +780,68 @@ async def handle_media_stream(websocket: WebSocket):
                                 ai_audio_ms_sent = 0
                                 response_start_timestamp_twilio = latest_media_timestamp
                                 if SHOW_TIMING_MATH:
-                                    print(
-                                        f"[DEBUG] set response_start_timestamp={response_start_timestamp_twilio}ms"
+                                    logger.debug(
+                                        "set response_start_timestamp=%sms",
+                                        response_start_timestamp_twilio,
                                     )
-                            ai_audio_ms_sent += int(len(decoded_bytes) / 8)
-                            await send_mark(websocket, stream_sid)
+                            # µ-law @ 8 kHz = 8 bytes per ms
+                            ai_audio_ms_sent += decoded_len // 8
+                            await send_mark(stream_sid)
                         except Exception as e:
-                            logger.error(f"Error sending audio to Twilio: {e}")
+                            logger.error("Error sending audio to Twilio: %s", e)
                             break
                     if response.get("type") == "response.audio.done":
                         logger.info("✔️ AI finished audio response")
-                        if websocket.client_state == WebSocketState.CONNECTED:
-                            await websocket.send_json({"event": "ai_response_done"})
+                        if ws_connected:
+                            await to_twilio.put(AI_RESPONSE_DONE_MESSAGE)
                     if response.get("type") == "input_audio_buffer.speech_started":
                         logger.info("🗣️ Speech started detected")
                         if last_assistant_item:
                             logger.info(
-                                f"Interrupting response id={last_assistant_item}"
+                                "Interrupting response id=%s",
+                                last_assistant_item,
                             )
                             await handle_speech_started_event()
             except WebSocketDisconnect:
                 logger.info("WebSocket disconnected in send_to_twilio")
             except Exception as e:
-                logger.error(f"Error in send_to_twilio: {e}")
+                logger.error("Error in send_to_twilio: %s", e)
             finally:
                 logger.info("send_to_twilio task ending")
 
-        async def send_mark(connection, stream_sid_local):
+        async def openai_writer():
+            while True:
+                message = await to_openai.get()
+                await openai_ws.send(message, text=True)
+
+        async def twilio_writer():
+            while True:
+                message = await to_twilio.get()
+                try:
+                    await websocket.send_text(message)
+                finally:
+                    to_twilio.task_done()
+
+        def discard_queued_twilio_messages():
+            while not to_twilio.empty():
+                to_twilio.get_nowait()
+                to_twilio.task_done()
+
+        async def send_json_to_twilio(event):
+            # Twilio expects text frames; orjson emits UTF-8 bytes
+            await to_twilio.put(orjson.dumps(event).decode())
+
+        async def send_mark(stream_sid_local):
+            nonlocal pending_marks
             if stream_sid_local:
-                mark_event = {
-                    "event": "mark",
-                    "streamSid": stream_sid_local,
-                    "mark": {"name": "responsePart"},
-                }
-                if connection.client_state == WebSocketState.CONNECTED:
-                    await connection.send_json(mark_event)
-                mark_queue.append("responsePart")
+                if ws_connected:
+                    await to_twilio.put(mark_message)
+                pending_marks += 1
                 if SHOW_TIMING_MATH:
-                    print("[DEBUG] sent mark=responsePart")
+                    logger.debug("sent mark=responsePart")
 
         async def handle_speech_started_event():
-            nonlocal response_start_timestamp_twilio, last_assistant_item, stream_sid, ai_audio_ms_sent, is_response_active
+            nonlocal response_start_timestamp_twilio, last_assistant_item, stream_sid, ai_audio_ms_sent, is_response_active, pending_marks
             # KORJAUS: Nollaa response-tila aina
             is_response_active = False
             if not last_assistant_item:
@@ -557,7 +853,8 @@ async def handle_media_stream(websocket: WebSocket):
             MIN_AI_SPEECH_MS = 1000
             if ai_audio_ms_sent < MIN_AI_SPEECH_MS:
                 logger.info(
-                    f"AI audio too short ({ai_audio_ms_sent}ms) - letting it reach minimum duration"
+                    "AI audio too short (%sms) - letting it reach minimum duration",
+                    ai_audio_ms_sent,
                 )
                 return
             TRUNCATE_BUFFER_MS = 150
@@ -566,8 +863,11 @@ async def handle_media_stream(websocket: WebSocket):
                 logger.info("Audio too short to truncate safely after buffer, skipping")
                 return
             if SHOW_TIMING_MATH:
-                print(
-                    f"[DEBUG] truncating at {audio_end_ms}ms (AI sent={ai_audio_ms_sent}ms, buffer={TRUNCATE_BUFFER_MS}ms)"
+                logger.debug(
+                    "truncating at %sms (AI sent=%sms, buffer=%sms)",
+                    audio_end_ms,
+                    ai_audio_ms_sent,
+                    TRUNCATE_BUFFER_MS,
                 )
             try:
                 truncate_event = {
@@ -576,120 +876,88 @@ async def handle_media_stream(websocket: WebSocket):
                     "content_index": 0,
                     "audio_end_ms": audio_end_ms,
                 }
-                await openai_ws.send(json.dumps(truncate_event))
-                if websocket.client_state == WebSocketState.CONNECTED:
-                    await websocket.send_json(
+                await openai_ws.send(orjson.dumps(truncate_event), text=True)
+                if ws_connected:
+                    # Audio still queued is exactly what is being cut off
+                    discard_queued_twilio_messages()
+                    await send_json_to_twilio(
                         {"event": "clear", "streamSid": stream_sid}
                     )
-                mark_queue.clear()
+                pending_marks = 0
                 logger.info(
-                    f"✂️ Truncated AI audio at {audio_end_ms}ms (of {ai_audio_ms_sent}ms total)"
+                    "✂️ Truncated AI audio at %sms (of %sms total)",
+                    audio_end_ms,
+                    ai_audio_ms_sent,
                 )
             except Exception as e:
-                logger.warning(f"Audio truncation failed (non-critical): {e}")
-                mark_queue.clear()
+                logger.warning("Audio truncation failed (non-critical): %s", e)
+                pending_marks = 0
             finally:
                 last_assistant_item = None
                 response_start_timestamp_twilio = None
                 ai_audio_ms_sent = 0
 
         logger.info("Starting async tasks for media stream")
-        tasks = [
-            asyncio.create_task(receive_from_twilio()),
-            asyncio.create_task(send_to_twilio()),
-        ]
-        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
-        logger.info(f"Task completed. Done: {len(done)}, Pending: {len(pending)}")
-        call_ended = True
-        for task in pending:
-            logger.info("Cancelling pending task")
-            task.cancel()
-            try:
-                await task
-            except asyncio.CancelledError:
-                logger.info("Task cancelled successfully")
+        # The first reader to finish raises _StreamEnded; the group cancels the rest
+        try:
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(_stop_stream_after(receive_from_twilio()))
+                tg.create_task(_stop_stream_after(send_to_twilio()))
+                tg.create_task(_stop_stream_after(call_ended.wait()))
+                tg.create_task(openai_writer())
+                tg.create_task(twilio_writer())
+        except* _StreamEnded:
+            pass
+        call_ended.set()
         logger.info("Media stream tasks completed")
     except Exception as e:
-        logger.error(f"Error in media stream WebSocket: {e}")
+        logger.error("Error in media stream WebSocket: %s", e)
     finally:
         logger.info("Cleaning up media stream resources")
         if openai_ws:
             try:
-                if hasattr(openai_ws, "closed"):
-                    if not openai_ws.closed:
-                        await openai_ws.close()
-                else:
-                    if getattr(openai_ws, "open", False):
-                        await openai_ws.close()
+                await _close_if_open(openai_ws)
                 logger.info("OpenAI WebSocket closed")
             except Exception as e:
-                logger.error(f"Error closing OpenAI WebSocket: {e}")
+                logger.error("Error closing OpenAI WebSocket: %s", e)
         try:
             if websocket.client_state != WebSocketState.DISCONNECTED:
                 await websocket.close()
             logger.info("Twilio WebSocket closed")
         except Exception as e:
-            logger.error(f"Error closing Twilio WebSocket: {e}")
-        # Capture article_id before cleanup so saving can update DB
-        captured_article_id = None
-        if stream_sid:
-            captured_article_id = stream_to_article.get(stream_sid)
-            await save_conversation_log(stream_sid, article_id=captured_article_id)
-
-        # Cleanup mappings after saving logs
-        try:
-            if stream_sid:
-                cs = stream_to_call.pop(stream_sid, None)
-                if cs:
-                    call_to_article.pop(cs, None)
-                stream_to_article.pop(stream_sid, None)
-                stream_phone_scripts.pop(stream_sid, None)
-        except Exception as e:
-            logger.warning(f"Cleanup mapping error: {e}")
+            logger.error("Error closing Twilio WebSocket: %s", e)
+        if stream_sid and call_state is not None:
+            await save_conversation_log(stream_sid, call_state)
         logger.info("Media stream handler completed")
 
 
-async def initialize_session(openai_ws, phone_script=None):
-    """Initialize OpenAI session with proper phone script if available"""
-
-    logger.info("📋 Building session configuration...")
-    logger.info(f"phone_script provided: {phone_script is not None}")
-
-    await asyncio.sleep(0.25)
-    logger.info("⏳ Sending session update after 250ms delay...")
-
+def _build_session_update(phone_script=None) -> dict:
+    """session.update event for a phone script, or the default interview"""
     # Use phone_script if provided, otherwise use defaults
     if phone_script:
-        logger.info("🎯 USING PHONE_SCRIPT CONFIGURATION!")
         base_instructions = (phone_script.get("instructions") or "").strip()
         questions = phone_script.get("questions_data") or []
         closing_q = phone_script.get("closing_question")
         requested_voice = phone_script.get("voice", VOICE)
 
-        supported_voices = [
-            "alloy",
-            "ash",
-            "ballad",
-            "coral",
-            "echo",
-            "sage",
-            "shimmer",
-            "verse",
-        ]
-        voice = requested_voice if requested_voice in supported_voices else (
+        voice = requested_voice if requested_voice in SUPPORTED_VOICES else (
             "coral" if phone_script.get("language") == "fi" else "alloy"
         )
         if voice != requested_voice:
             logger.warning(
-                f"Voice '{requested_voice}' not supported, using '{voice}' instead"
+                "Voice '%s' not supported, using '%s' instead",
+                requested_voice,
+                voice,
             )
 
         temperature = phone_script.get("temperature", 0.8)
         language = phone_script.get("language", "fi")
 
         # Order questions by 'position' with a stable fallback to their input order
-        ordered = sorted(list(enumerate(questions, start=1)), key=lambda x: x[1].get("position", x[0]))
-        q_lines = [f"{idx}. {q.get('text')}" for idx, q in ordered if q.get("text")]
+        ordered = [(q.get("position", i), i, q) for i, q in enumerate(questions, 1)]
+        ordered.sort()
+        texts = [q["text"] for _, _, q in ordered if q.get("text")]
+        q_lines = [f"{rank}. {text}" for rank, text in enumerate(texts, start=1)]
         if closing_q:
             q_lines.append(f"{len(q_lines)+1}. {closing_q}")
 
@@ -703,13 +971,12 @@ async def initialize_session(openai_ws, phone_script=None):
         ]))
 
     else:
-        logger.info("🔄 Using default configuration")
         instructions = SYSTEM_MESSAGE
         voice = VOICE
         temperature = 0.8
         language = "fi"
 
-    session_update = {
+    return {
         "type": "session.update",
         "session": {
             "turn_detection": {
@@ -733,59 +1000,101 @@ async def initialize_session(openai_ws, phone_script=None):
         },
     }
 
-    print("TÄÄ KIINNOSTAA!")
-    print(session_update)
+
+# Serialized session.update events: the default one once at import, scripted
+# ones per distinct script (keyed by its canonical JSON)
+DEFAULT_SESSION_UPDATE = orjson.dumps(_build_session_update())
+
+
+@lru_cache(maxsize=32)
+def _scripted_session_update(script_key: bytes) -> bytes:
+    return orjson.dumps(_build_session_update(orjson.loads(script_key)))
+
+
+def _session_update_for(phone_script=None) -> bytes:
+    """Serialized session.update for a phone script (cached), or the default one"""
+    if not phone_script:
+        return DEFAULT_SESSION_UPDATE
+    return _scripted_session_update(
+        orjson.dumps(phone_script, option=orjson.OPT_SORT_KEYS)
+    )
+
+
+async def initialize_session(
+    openai_ws, session_update: bytes = DEFAULT_SESSION_UPDATE
+):
+    """Send the pre-serialized session.update for this call to OpenAI"""
+
+    await asyncio.sleep(0.25)
+    logger.info("⏳ Sending session update after 250ms delay...")
+
+    if session_update is DEFAULT_SESSION_UPDATE:
+        logger.info("🔄 Using default configuration")
+    else:
+        logger.info("🎯 USING PHONE_SCRIPT CONFIGURATION!")
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Session update payload: %s", session_update.decode())
 
     try:
         logger.info("📤 Sending session update...")
-        logger.info(f"Voice: {voice}, Temperature: {temperature}")
-        preview = "\n".join(instructions.splitlines()[:12])
-        logger.info(f"Instructions preview:\n{preview}")
-
-        await openai_ws.send(json.dumps(session_update))
+        await openai_ws.send(session_update, text=True)
         logger.info("✅ Session update sent successfully")
 
     except Exception as e:
-        logger.error(f"❌ Failed to send session update: {e}")
+        logger.error("❌ Failed to send session update: %s", e)
         raise
 
 
-async def save_conversation_log(stream_sid, article_id=None):
+def _write_json_file(path, data):
+    _ensure_log_dir()
+    with open(path, "wb") as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+
+
+async def save_conversation_log(stream_sid, call_state: CallState):
     """Save conversation log to files and UPDATE database using article_id."""
     try:
-        if stream_sid not in conversation_logs or not conversation_logs[stream_sid]:
+        # The message log was streamed to NDJSON during the call (the file is
+        # opened when the stream starts); let the last lines land, then close it
+        log_file = call_state.log_file
+        call_state.log_file = None
+        if call_state.log_writer is not None:
+            await call_state.log_writer
+        log_filepath = log_file.name if log_file else None
+        if log_file:
+            await asyncio.to_thread(log_file.close)
+
+        conversation_log = call_state.logs
+        if not conversation_log:
             logger.info(
-                f"No conversation log found for stream_sid {stream_sid}, nothing to save."
+                "No conversation log found for stream_sid %s, nothing to save.",
+                stream_sid,
             )
             return
 
-        conversation_log = conversation_logs.pop(stream_sid)
-
-        log_dir = "conversations_log"
-        os.makedirs(log_dir, exist_ok=True)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        log_filepath = os.path.join(
-            log_dir, f"conversation_log_{stream_sid}_{timestamp}.json"
-        )
-
-        with open(log_filepath, "w", encoding="utf-8") as f:
-            json.dump(conversation_log, f, ensure_ascii=False, indent=2)
-
+        # Merge consecutive messages from the same speaker into one turn
         dialogue_turns = []
-        for speaker, group in groupby(conversation_log, key=lambda x: x["speaker"]):
-            texts = [msg["text"] for msg in group]
+        speaker = None
+        texts = []
+        for msg in conversation_log:
+            if msg["speaker"] != speaker:
+                if texts:
+                    dialogue_turns.append(
+                        {"speaker": speaker, "text": "\n".join(texts)}
+                    )
+                    texts = []
+                speaker = msg["speaker"]
+            texts.append(msg["text"])
+        if texts:
             dialogue_turns.append({"speaker": speaker, "text": "\n".join(texts)})
 
-        turns_filepath = os.path.join(
-            log_dir, f"conversation_turns_{stream_sid}_{timestamp}.json"
-        )
-        with open(turns_filepath, "w", encoding="utf-8") as f:
-            json.dump(dialogue_turns, f, ensure_ascii=False, indent=2)
-
-        # Use provided article_id or fall back to current mapping without popping
-        if article_id is None:
-            article_id = stream_to_article.get(stream_sid)
+        log_name = call_state.log_name or f"{stream_sid}_{time.strftime('%Y%m%d_%H%M%S')}"
+        turns_filepath = os.path.join(LOG_DIR, f"conversation_turns_{log_name}.json")
+        # Serialize and write in a worker thread so other calls' audio keeps flowing
+        await asyncio.to_thread(_write_json_file, turns_filepath, dialogue_turns)
 
+        article_id = call_state.article_id
         if article_id is not None:
             interview_id = await update_interview_by_article_id(
                 article_id, dialogue_turns
@@ -793,96 +1102,103 @@ async def save_conversation_log(stream_sid, article_id=None):
 
             if interview_id:
                 logger.info(
-                    f"✅ Interview {interview_id} updated for article {article_id}"
+                    "✅ Interview %s updated for article %s",
+                    interview_id,
+                    article_id,
                 )
             else:
-                logger.info(f"ℹ️ No initiated interview found for article: {article_id}")
+                logger.info(
+                    "ℹ️ No initiated interview found for article: %s",
+                    article_id,
+                )
         else:
             logger.info("ℹ️ No article_id available - this is likely a test call")
 
         logger.info(
-            f"Conversation log for stream_sid {stream_sid} saved successfully ({len(conversation_log)} messages)"
+            "Conversation log for stream_sid %s saved successfully (%s messages)",
+            stream_sid,
+            len(conversation_log),
         )
-        logger.info(f"Files saved: {log_filepath} and {turns_filepath}")
+        logger.info("Files saved: %s and %s", log_filepath, turns_filepath)
 
     except Exception as e:
-        logger.error(f"Error saving conversation log for stream_sid {stream_sid}: {e}")
+        logger.error(
+            "Error saving conversation log for stream_sid %s: %s",
+            stream_sid,
+            e,
+        )
+
+
+# One round-trip: complete the interview and close its call attempts. A constant
+# string, so asyncpg's per-connection statement cache reuses the prepared plan.
+UPDATE_INTERVIEW_SQL = """
+    WITH upd AS (
+        UPDATE phone_interview
+        SET
+            transcript_json = $1,
+            status = $2
+        WHERE news_article_id = $3
+        RETURNING id
+    ), attempts AS (
+        UPDATE phone_interview_attempt
+        SET ended_at = NOW(), status = $2
+        WHERE phone_interview_id IN (SELECT id FROM upd)
+    )
+    SELECT id FROM upd
+"""
 
 
 async def update_interview_by_article_id(article_id, dialogue_turns):
     """Update existing phone interview with transcript using article_id."""
     try:
-        import asyncpg
-
-        conn = await asyncpg.connect(
-            host=os.getenv("DB_HOST", "localhost"),
-            port=os.getenv("DB_PORT", 5432),
-            user=os.getenv("DB_USER", "postgres"),
-            password=os.getenv("DB_PASSWORD"),
-            database=os.getenv("DB_NAME", "newsroom"),
-        )
+        assistant_count = user_count = 0
+        for turn in dialogue_turns:
+            speaker = turn.get("speaker")
+            if speaker == "assistant":
+                assistant_count += 1
+            elif speaker == "user":
+                user_count += 1
 
         transcript_json = {
             "dialogue_turns": dialogue_turns,
             "call_metadata": {
                 "completed_at": datetime.now().isoformat(),
                 "total_turns": len(dialogue_turns),
-                "total_assistant_messages": len(
-                    [t for t in dialogue_turns if t.get("speaker") == "assistant"]
-                ),
-                "total_user_messages": len(
-                    [t for t in dialogue_turns if t.get("speaker") == "user"]
-                ),
+                "total_assistant_messages": assistant_count,
+                "total_user_messages": user_count,
             },
         }
 
-        update_query = """
-            UPDATE phone_interview 
-            SET 
-                transcript_json = $1,
-                status = $2
-            WHERE news_article_id = $3 
-            RETURNING id
-        """
-
-        interview_id = await conn.fetchval(
-            update_query,
-            json.dumps(transcript_json),
-            "completed",
-            article_id,
-        )
+        # asyncpg passes JSONB parameters as text
+        transcript = orjson.dumps(transcript_json).decode()
 
-        if interview_id:
-            await conn.execute(
-                """
-                UPDATE phone_interview_attempt 
-                SET ended_at = NOW(), status = $1
-                WHERE phone_interview_id = $2
-                """,
-                "completed",
-                interview_id,
+        pool = await get_db_pool()
+        async with pool.acquire() as conn:
+            interview_id = await conn.fetchval(
+                UPDATE_INTERVIEW_SQL, transcript, "completed", article_id
             )
 
+        if interview_id:
             logger.info(
-                f"📊 Updated interview ID {interview_id} for article {article_id} with transcript ({len(dialogue_turns)} turns)"
+                "📊 Updated interview ID %s for article %s with transcript (%s turns)",
+                interview_id,
+                article_id,
+                len(dialogue_turns),
             )
             # Fire-and-forget enrichment in background
-            try:
-                asyncio.create_task(process_call_ended(article_id, dialogue_turns))
-                logger.info("📤 Webhook queued (fire-and-forget)")
-            except Exception as e:
-                logger.warning(f"Failed to schedule enrichment task: {e}")
+            schedule_enrichment(article_id, dialogue_turns)
+            logger.info("📤 Webhook queued (fire-and-forget)")
         else:
             logger.warning(
-                f"⚠️ No initiated phone_interview found for article: {article_id}"
+                "⚠️ No initiated phone_interview found for article: %s",
+                article_id,
             )
             logger.info(
                 "This might be a test call or the interview was already completed"
             )
 
-        await conn.close()
         return interview_id
 
     except Exception as e:
-        logger.error(f"❌ Failed to update interview in database: {e}")
+        logger.error("❌ Failed to update interview in database: %s", e)
         return None
@@ -314,6 +314,10 @@ ON prompt_compositions(is_active) WHERE is_active = true;
 CREATE INDEX idx_prompt_fragments_name ON prompt_fragments(name);
 CREATE INDEX idx_prompt_compositions_active ON prompt_compositions(is_active);
 CREATE INDEX idx_prompt_compositions_name ON prompt_compositions(name);
+-- Covers the admin listing (ORDER BY is_active DESC, created_at DESC) without heap fetches
+CREATE INDEX idx_prompt_compositions_active_created
+ON prompt_compositions(is_active DESC, created_at DESC)
+INCLUDE (id, name, ethical_persona_id, fragment_ids);
 
 -- INDEXES
 CREATE INDEX idx_status ON editorial_reviews(status);
@@ -1,5 +1,6 @@
 import os
 import logging
+from functools import lru_cache
 from typing import Optional, Dict, Any
 from langchain.chat_models import init_chat_model
 import psycopg  # type: ignore
@@ -12,13 +13,24 @@ from schemas.interview_schema import DataAfterInterviewFromDatabase
 
 logger = logging.getLogger(__name__)
 
+# Enrichment runs on a fixed pool of threads (utils/interview_processor.py) that
+# cannot be cancelled from outside, so every blocking call here is bounded
+LLM_TIMEOUT = 120  # seconds per OpenAI request
+LLM_MAX_RETRIES = 2
+DB_CONNECT_TIMEOUT = 10
+
 
 class PhoneInterviewIntegration:
     """Integration layer for enriching articles with phone interview content."""
 
     def __init__(self, db_dsn: str, llm_model: str = "gpt-4o-mini"):
         self.db_dsn = db_dsn
-        self.llm = init_chat_model(llm_model, model_provider="openai")
+        self.llm = init_chat_model(
+            llm_model,
+            model_provider="openai",
+            timeout=LLM_TIMEOUT,
+            max_retries=LLM_MAX_RETRIES,
+        )
         self.enricher_agent = ArticleEnricherAgent(self.llm, db_dsn)
         self.article_service = NewsArticleService(db_dsn)
 
@@ -127,7 +139,7 @@ class PhoneInterviewIntegration:
     def _load_article_from_db(self, article_id: int) -> DataAfterInterviewFromDatabase:
         """Load article from database."""
         try:
-            with psycopg.connect(self.db_dsn) as conn:
+            with psycopg.connect(self.db_dsn, connect_timeout=DB_CONNECT_TIMEOUT) as conn:
                 with conn.cursor() as cur:
                     cur.execute(
                         """
@@ -159,6 +171,16 @@ class PhoneInterviewIntegration:
             return None
 
 
+@lru_cache(maxsize=4)
+def _get_integration(db_dsn: str) -> PhoneInterviewIntegration:
+    """One integration (chat model, agent, service) per DSN, shared by all calls.
+
+    Every attribute is fixed after construction, so the enrichment threads can
+    use the same instance concurrently.
+    """
+    return PhoneInterviewIntegration(db_dsn)
+
+
 # YKSINKERTAINEN FUNKTIO ULKOISEN SERVERIN KÄYTTÖÖN
 def enrich_article_with_phone_call(
     article_id: str,
@@ -197,7 +219,7 @@ def enrich_article_with_phone_call(
         }
 
     db_dsn = os.getenv("DATABASE_URL")
-    integration = PhoneInterviewIntegration(db_dsn)
+    integration = _get_integration(db_dsn)
 
     return integration.enrich_article_with_phone_interview(
         article_id_int,
@@ -213,7 +235,7 @@ def _get_contact_info_by_article_id(article_id: int) -> Optional[Dict[str, Any]]
     db_dsn = os.getenv("DATABASE_URL")
 
     try:
-        with psycopg.connect(db_dsn) as conn:
+        with psycopg.connect(db_dsn, connect_timeout=DB_CONNECT_TIMEOUT) as conn:
             with conn.cursor() as cur:
                 # 1) Hae artikkelin canonical_news_id id:llä
                 cur.execute(
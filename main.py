@@ -20,13 +20,19 @@ from agents.article_storer_agent import ArticleStorerAgent
 from agents.contacts_extractor_agent import ContactsExtractorAgent
 from schemas.feed_schema import NewsFeedConfig
 from schemas.agent_state import AgentState
+from services.editor_review_service import EditorialReviewService
 from langgraph.graph import StateGraph, START, END
 from langchain.chat_models import init_chat_model
 import yaml
+import asyncio
 import time
+import logging
+import logging.handlers
 import os
+import queue
 import threading
 from email_processor import check_and_process_emails
+from psycopg_pool import ConnectionPool
 
 # THIS IS THE AGENT SYSTEM THAT GENERATES, REVIEWS, EDITS, INTERVIEWS AND PUBLISHES NEWS ARTICLES
 
@@ -48,25 +54,52 @@ with open("newsfeeds.yaml") as f:
 feeds = [NewsFeedConfig(**feed) for feed in config["feeds"]]
 
 
-def run_email_checker():
-    """Tarkista sähköpostit 15 min välein taustasäikeenä"""
+# One pool and review service for every editorial batch, instead of new
+# connections for each agent the subgraph builds
+_editorial_service = None
+
+
+def get_editorial_service() -> EditorialReviewService:
+    """Get or create the shared EditorialReviewService and its connection pool"""
+    global _editorial_service
+    if _editorial_service is None:
+        pool = ConnectionPool(
+            db_dsn,
+            min_size=1,
+            max_size=8,
+            kwargs={"prepare_threshold": 5},
+            open=True,
+        )
+        _editorial_service = EditorialReviewService(db_dsn, pool=pool)
+    return _editorial_service
+
+
+EMAIL_CHECK_INTERVAL = 900  # 15 min
+
+
+def run_email_check():
+    """Tarkista sähköpostit kerran"""
+    try:
+        print(
+            f"📧 [{time.strftime('%Y-%m-%d %H:%M:%S')}] Checking for new email replies..."
+        )
+        check_and_process_emails()
+        print("✅ Email check completed successfully")
+    except Exception as e:
+        print(f"❌ Email check failed: {e}")
+    print("")
+
+
+def run_email_checker(stop_event: threading.Event):
+    """Tarkista sähköpostit 15 min välein taustasäikeenä, kunnes stop_event asetetaan"""
     print("🔍 Email Processor starting in background...")
     print("⏰ Checking emails every 15 minutes")
     print("")
-
     while True:
-        try:
-            print(
-                f"📧 [{time.strftime('%Y-%m-%d %H:%M:%S')}] Checking for new email replies..."
-            )
-            check_and_process_emails()
-            print("✅ Email check completed successfully")
-        except Exception as e:
-            print(f"❌ Email check failed: {e}")
-
-        print("⏳ Sleeping for 15 minutes...")
-        print("")
-        time.sleep(900)  # 15 min
+        run_email_check()
+        # wait() palaa heti, kun sammutus asettaa eventin
+        if stop_event.wait(EMAIL_CHECK_INTERVAL):
+            break
 
 
 def has_articles(state):
@@ -100,13 +133,18 @@ def create_editorial_subgraph():
     subgraph = StateGraph(AgentState)
 
     # Initialize agents using existing ones
-    editor_in_chief = EditorInChiefAgent(llm=llm, db_dsn=db_dsn)
+    editorial_service = get_editorial_service()
+    editor_in_chief = EditorInChiefAgent(
+        llm=llm, db_dsn=db_dsn, editorial_service=editorial_service
+    )
     article_fixer = ArticleFixerAgent(
         llm=llmBetter, db_dsn=db_dsn
     )  # For interview/revision planning
     article_publisher = ArticlePublisherAgent(db_dsn=db_dsn)  # For publishing
     article_fix_validator = FixValidationAgent(llm=llm)  # For validating fixes
-    article_rejecter = ArticleRejectAgent(db_dsn=db_dsn)  # For rejecting articles
+    article_rejecter = ArticleRejectAgent(
+        db_dsn=db_dsn, editorial_service=editorial_service
+    )  # For rejecting articles
     # INTERVIEWS
     interview_planner = InterviewPlanningAgent(llm=llmBetter, db_dsn=db_dsn)
     interview_email_executor = EmailInterviewExecutionAgent(db_dsn=db_dsn)
@@ -182,6 +220,43 @@ def create_editorial_subgraph():
     return subgraph.compile()
 
 
+# How many articles go through the editorial subgraph at the same time
+EDITORIAL_CONCURRENCY = 8
+
+
+async def _review_articles(editorial_subgraph, articles):
+    """Run every article through the editorial subgraph, a few at a time."""
+    semaphore = asyncio.Semaphore(EDITORIAL_CONCURRENCY)
+    total = len(articles)
+
+    async def review_one(i, article):
+        async with semaphore:
+            try:
+                print(f"\n{'-'*70}")
+                print(
+                    f"📰 Article {i}/{total}: {getattr(article, 'enriched_title', 'Untitled')[:50]}..."
+                )
+                print(f"{'-'*70}")
+
+                article_state = AgentState(current_article=article)
+                # Sync agent nodes run in worker threads, so LLM waits overlap
+                result_state = await editorial_subgraph.ainvoke(article_state)
+
+                if result_state is None:
+                    print(f"⚠️ Subgraph returned None for article {i}")
+
+            except Exception as e:
+                print(f"\n❌ ERROR in editorial review for article {i}:")
+                print(f"   Exception: {e}")
+                import traceback
+
+                traceback.print_exc()
+
+    await asyncio.gather(
+        *(review_one(i, article) for i, article in enumerate(articles, 1))
+    )
+
+
 # We can use this function to process a batch of articles through editorial review
 def process_editorial_batch(state: AgentState):
     """Process all enriched articles through editorial review using subgraph."""
@@ -195,33 +270,23 @@ def process_editorial_batch(state: AgentState):
     print(f"📊 EDITORIAL BATCH: Processing {len(state.enriched_articles)} articles...")
     print(f"{'='*70}\n")
 
-    for i, article in enumerate(state.enriched_articles):
-        try:
-            print(f"\n{'-'*70}")
-            print(
-                f"📰 Article {i+1}/{len(state.enriched_articles)}: {getattr(article, 'enriched_title', 'Untitled')[:50]}..."
-            )
-            print(f"{'-'*70}")
-
-            article_state = AgentState(current_article=article)
-            result_state = editorial_subgraph.invoke(article_state)
-
-            if result_state is None:
-                print(f"⚠️ Subgraph returned None for article {i+1}")
-                continue
-
-        except Exception as e:
-            print(f"\n❌ ERROR in editorial review for article {i+1}:")
-            print(f"   Exception: {e}")
-            import traceback
-
-            traceback.print_exc()
-            continue
+    asyncio.run(_review_articles(editorial_subgraph, state.enriched_articles))
     return state
 
 
 if __name__ == "__main__":
     # START THE WHOLE AGENT THINGS BY COMMAND: python main.py
+    # Agents only enqueue log records; a listener thread does the actual I/O
+    log_queue = queue.SimpleQueue()
+    log_handler = logging.StreamHandler()
+    log_handler.setFormatter(
+        logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+    )
+    log_listener = logging.handlers.QueueListener(log_queue, log_handler)
+    logging.basicConfig(
+        level=logging.INFO, handlers=[logging.handlers.QueueHandler(log_queue)]
+    )
+    log_listener.start()
     feed_reader = FeedReaderAgent(feed_urls=[f.url for f in feeds], max_news=3)
     article_extractor = ArticleContentExtractorAgent()
     news_storer = NewsStorerAgent(db_dsn=db_dsn)
@@ -277,15 +342,26 @@ if __name__ == "__main__":
 
     graph = graph_builder.compile()
 
-    # Käynnistä email checker taustasäikeenä
-    email_thread = threading.Thread(target=run_email_checker, daemon=True)
+    # Käynnistä email checker taustasäikeenä; se tarkistaa sähköpostit graafin
+    # ajon aikana ja pysähtyy heti, kun email_stop asetetaan
+    email_stop = threading.Event()
+    email_thread = threading.Thread(
+        target=run_email_checker, args=(email_stop,), name="email-checker", daemon=True
+    )
     email_thread.start()
     print("✅ Email processor background thread started")
     print("")
 
     # Run the agent graph in a loop to continuously fetch and process news articles
-    while True:
-        state = AgentState()
-        result = graph.invoke(state)
-        print("Graph done!")
-        time.sleep(120)
+    try:
+        while True:
+            state = AgentState()
+            result = graph.invoke(state)
+            print("Graph done!")
+            time.sleep(120)
+    finally:
+        email_stop.set()
+        article_image_generator.close()
+        if _editorial_service is not None:
+            _editorial_service.pool.close()
+        log_listener.stop()
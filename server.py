@@ -1,7 +1,11 @@
 # server.py
+import asyncio
 import os
 import sys
 import logging
+import logging.handlers
+import queue
+from contextlib import asynccontextmanager
 
 # thi server is ment for BUSINESS LOGIC, not for GraphQL (newsroom frontend)
 
@@ -11,22 +15,56 @@ import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from dotenv import load_dotenv
 
 # Import routers
 from api.admin import personas, compositions, fragments, test_article
 from api.twilio import phone_service
+from utils.database import open_api_pool, close_api_pool, close_db_pool
 
 load_dotenv()
 
-# Setup logging
-logging.basicConfig(level=logging.INFO)
+# Setup logging: request handlers only enqueue records, a listener thread does the I/O
+log_queue = queue.SimpleQueue()
+log_handler = logging.StreamHandler()
+log_handler.setFormatter(
+    logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+)
+log_listener = logging.handlers.QueueListener(log_queue, log_handler)
+logging.basicConfig(
+    level=logging.INFO,
+    handlers=[logging.handlers.QueueHandler(log_queue)],
+    force=True,
+)
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # uvloop is selected by uvicorn when installed; log it so deployments can verify
+    log_listener.start()
+    loop = asyncio.get_running_loop()
+    logger.info("Event loop: %s.%s", type(loop).__module__, type(loop).__name__)
+    await open_api_pool()
+    try:
+        yield
+    finally:
+        await close_api_pool()
+        await close_db_pool()
+        test_article.close_db_pool()
+        await phone_service.close_twilio_http()
+        await phone_service.openai_pool.close()
+        log_listener.stop()
+
+
 # FastAPI app
 app = FastAPI(
-    title="Newsroom API", version="1.0.0", description="Admin + Callbacks + Twilio API"
+    title="Newsroom API",
+    version="1.0.0",
+    description="Admin + Callbacks + Twilio API",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 from fastapi.staticfiles import StaticFiles
 
@@ -92,4 +130,12 @@ if __name__ == "__main__":
     import uvicorn
 
     port = int(os.getenv("BUSINESS_LOGIC_SERVER", 8000))
-    uvicorn.run("server:app", host="0.0.0.0", port=port, reload=True)
+    # uvloop + httptools are used automatically when installed (requirements-backend.txt)
+    # Twilio media streams carry base64 audio, which permessage-deflate can't shrink
+    uvicorn.run(
+        "server:app",
+        host="0.0.0.0",
+        port=port,
+        reload=True,
+        ws_per_message_deflate=False,
+    )
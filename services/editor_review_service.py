@@ -3,7 +3,7 @@ Editorial Review Service - Simple version following NewsArticleService pattern
 """
 
 import psycopg
-from psycopg.types.json import Jsonb
+from psycopg_pool import ConnectionPool
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from schemas.editor_in_chief_schema import ReviewedNewsItem, ReasoningStep
@@ -12,16 +12,23 @@ from schemas.editor_in_chief_schema import ReviewedNewsItem, ReasoningStep
 class EditorialReviewService:
     """Service for managing editorial review data - simple and clean like NewsArticleService"""
 
-    def __init__(self, db_dsn: str):
-        """Initialize with database connection string"""
+    def __init__(self, db_dsn: str, pool: Optional[ConnectionPool] = None):
+        """Initialize with database connection string and optional shared pool"""
         self.db_dsn = db_dsn
+        self.pool = pool
         print(f"🔗 Initializing EditorialReviewService with DSN: {db_dsn[:50]}...")
         self._setup_tables()
         print("✅ EditorialReviewService initialized successfully")
 
+    def connection(self):
+        """Borrow a connection from the shared pool, or open a new one"""
+        if self.pool is not None:
+            return self.pool.connection()
+        return psycopg.connect(self.db_dsn)
+
     def _setup_tables(self):
         """Ensure database tables and indexes exist"""
-        with psycopg.connect(self.db_dsn) as conn:
+        with self.connection() as conn:
             with conn.cursor() as cur:
                 # Create helpful indexes if they don't exist
                 cur.execute(
@@ -37,152 +44,30 @@ class EditorialReviewService:
                 )
                 conn.commit()
 
-    def save_review(self, article_id: str, review: ReviewedNewsItem) -> bool:
+    def save_review(
+        self,
+        article_id: str,
+        review: ReviewedNewsItem,
+        review_json: Optional[str] = None,
+    ) -> bool:
         """
         Save editorial review decision to database
 
         Args:
             article_id: Unique identifier for the generated news article
             review: ReviewedNewsItem object containing the full review decision
+            review_json: Optional pre-serialized review (review.model_dump_json())
 
         Returns:
             bool: True if saved successfully, False otherwise
         """
         try:
-            with psycopg.connect(self.db_dsn) as conn:
+            with self.connection() as conn:
                 with conn.cursor() as cur:
-                    # Determine final decision
-                    final_decision = None
-                    if review.reconsideration:
-                        final_decision = review.reconsideration.final_decision
-                    elif review.editorial_reasoning.initial_decision:
-                        final_decision = review.editorial_reasoning.initial_decision
-
-                    # Extract featured status
-                    featured = (
-                        review.headline_news_assessment.featured
-                        if review.headline_news_assessment
-                        else False
-                    )
-
-                    # Extract interview decision data
-                    interview_needed = (
-                        review.interview_decision.interview_needed
-                        if review.interview_decision
-                        else False
-                    )
-
-                    interview_decision_json = (
-                        Jsonb(review.interview_decision.model_dump())
-                        if review.interview_decision
-                        else None
-                    )
-
-                    # Use consistent timestamp for both created_at and updated_at
-                    now = datetime.now()
-
-                    # Insert/Update main review record - interview_decision tallennetaan vain review_data:han
-                    cur.execute(
-                        """
-                            INSERT INTO editorial_reviews 
-                            (article_id, review_data, status, reviewer, initial_decision, 
-                             final_decision, has_warning, featured, interview_decision, created_at, updated_at)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                            ON CONFLICT (article_id) 
-                            DO UPDATE SET 
-                                review_data = EXCLUDED.review_data,
-                                status = EXCLUDED.status,
-                                final_decision = EXCLUDED.final_decision,
-                                has_warning = EXCLUDED.has_warning,
-                                featured = EXCLUDED.featured,
-                                interview_decision = EXCLUDED.interview_decision,
-                                updated_at = EXCLUDED.updated_at
-                        """,
-                        (
-                            article_id,
-                            Jsonb(review.model_dump()),
-                            review.status,
-                            review.editorial_reasoning.reviewer,
-                            review.editorial_reasoning.initial_decision,
-                            final_decision,
-                            review.editorial_warning is not None,
-                            featured,
-                            interview_decision_json,
-                            now,
-                            now,
-                        ),
-                    )
-
-                    # OPTIMIZED: Update news_article table only when values are true
-                    # (both featured and interview_decision default to false, no need to update false values)
-                    updates_needed = []
-                    params = []
-
-                    if featured:
-                        updates_needed.append("featured = true")
-
-                    if interview_needed:
-                        # Store interview flag on news_article using the correct column
-                        updates_needed.append("interview_decision = true")
-
-                    # Only update if we have something to update
-                    if updates_needed:
-                        updates_needed.append("updated_at = %s")
-                        params.append(now)
-                        params.append(article_id)
-
-                        update_sql = f"""
-                            UPDATE news_article 
-                            SET {', '.join(updates_needed)}
-                            WHERE id = %s
-                        """
-
-                        cur.execute(update_sql, params)
-
-                    # Clear and re-insert related data
-                    cur.execute(
-                        "DELETE FROM editorial_issues WHERE article_id = %s",
-                        (article_id,),
-                    )
-                    cur.execute(
-                        "DELETE FROM editorial_reasoning_steps WHERE article_id = %s",
-                        (article_id,),
+                    featured, interview_needed = self._write_review(
+                        cur, article_id, review, review_json
                     )
 
-                    # Insert issues
-                    for issue in review.issues:
-                        cur.execute(
-                            """
-                            INSERT INTO editorial_issues 
-                            (article_id, issue_type, location, description, suggestion)
-                            VALUES (%s, %s, %s, %s, %s)
-                        """,
-                            (
-                                article_id,
-                                issue.type,
-                                issue.location,
-                                issue.description,
-                                issue.suggestion,
-                            ),
-                        )
-
-                    # Insert reasoning steps
-                    self._insert_reasoning_steps(
-                        cur,
-                        article_id,
-                        review.editorial_reasoning.reasoning_steps,
-                        False,
-                    )
-
-                    # Insert reconsideration steps if present
-                    if review.reconsideration:
-                        self._insert_reasoning_steps(
-                            cur,
-                            article_id,
-                            review.reconsideration.reasoning_steps,
-                            True,
-                        )
-
                     conn.commit()
                     print(f"✅ Successfully saved review for article {article_id}")
                     print(f"   - Editorial review: ✅")
@@ -216,6 +101,155 @@ class EditorialReviewService:
             print(f"Error saving editorial review for article {article_id}: {e}")
             return False
 
+    def _write_review(
+        self,
+        cur,
+        article_id: str,
+        review: ReviewedNewsItem,
+        review_json: Optional[str] = None,
+    ) -> tuple[bool, bool]:
+        """Run the review writes on the given cursor without committing.
+
+        Returns:
+            tuple: (featured, interview_needed) flags applied to news_article
+        """
+        # Determine final decision
+        final_decision = None
+        if review.reconsideration:
+            final_decision = review.reconsideration.final_decision
+        elif review.editorial_reasoning.initial_decision:
+            final_decision = review.editorial_reasoning.initial_decision
+
+        # Extract featured status
+        featured = (
+            review.headline_news_assessment.featured
+            if review.headline_news_assessment
+            else False
+        )
+
+        # Extract interview decision data
+        interview_needed = (
+            review.interview_decision.interview_needed
+            if review.interview_decision
+            else False
+        )
+
+        # Serialized with pydantic's JSON encoder and cast to jsonb in SQL
+        interview_decision_json = (
+            review.interview_decision.model_dump_json()
+            if review.interview_decision
+            else None
+        )
+        if review_json is None:
+            review_json = review.model_dump_json()
+
+        # Use consistent timestamp for both created_at and updated_at
+        now = datetime.now()
+
+        # Insert/Update main review record - interview_decision tallennetaan vain review_data:han
+        cur.execute(
+            """
+                INSERT INTO editorial_reviews 
+                (article_id, review_data, status, reviewer, initial_decision, 
+                 final_decision, has_warning, featured, interview_decision, created_at, updated_at)
+                VALUES (%s, %s::jsonb, %s, %s, %s, %s, %s, %s, %s::jsonb, %s, %s)
+                ON CONFLICT (article_id) 
+                DO UPDATE SET 
+                    review_data = EXCLUDED.review_data,
+                    status = EXCLUDED.status,
+                    final_decision = EXCLUDED.final_decision,
+                    has_warning = EXCLUDED.has_warning,
+                    featured = EXCLUDED.featured,
+                    interview_decision = EXCLUDED.interview_decision,
+                    updated_at = EXCLUDED.updated_at
+            """,
+            (
+                article_id,
+                review_json,
+                review.status,
+                review.editorial_reasoning.reviewer,
+                review.editorial_reasoning.initial_decision,
+                final_decision,
+                review.editorial_warning is not None,
+                featured,
+                interview_decision_json,
+                now,
+                now,
+            ),
+        )
+
+        # OPTIMIZED: Update news_article table only when values are true
+        # (both featured and interview_decision default to false, no need to update false values)
+        updates_needed = []
+        params = []
+
+        if featured:
+            updates_needed.append("featured = true")
+
+        if interview_needed:
+            # Store interview flag on news_article using the correct column
+            updates_needed.append("interview_decision = true")
+
+        # Only update if we have something to update
+        if updates_needed:
+            updates_needed.append("updated_at = %s")
+            params.append(now)
+            params.append(article_id)
+
+            update_sql = f"""
+                UPDATE news_article 
+                SET {', '.join(updates_needed)}
+                WHERE id = %s
+            """
+
+            cur.execute(update_sql, params)
+
+        # Clear and re-insert related data
+        cur.execute(
+            "DELETE FROM editorial_issues WHERE article_id = %s",
+            (article_id,),
+        )
+        cur.execute(
+            "DELETE FROM editorial_reasoning_steps WHERE article_id = %s",
+            (article_id,),
+        )
+
+        # Insert issues
+        for issue in review.issues:
+            cur.execute(
+                """
+                INSERT INTO editorial_issues 
+                (article_id, issue_type, location, description, suggestion)
+                VALUES (%s, %s, %s, %s, %s)
+            """,
+                (
+                    article_id,
+                    issue.type,
+                    issue.location,
+                    issue.description,
+                    issue.suggestion,
+                ),
+            )
+
+        # Insert reasoning steps
+        self._insert_reasoning_steps(
+            cur,
+            article_id,
+            review.editorial_reasoning.reasoning_steps,
+            False,
+        )
+
+        # Insert reconsideration steps if present
+        if review.reconsideration:
+            self._insert_reasoning_steps(
+                cur,
+                article_id,
+                review.reconsideration.reasoning_steps,
+                True,
+            )
+
+        return featured, interview_needed
+
     def _insert_reasoning_steps(
         self,
         cur,
@@ -242,20 +276,30 @@ class EditorialReviewService:
             )
 
     def save_editorial_review(
-        self, news_article_id: int, review_data: ReviewedNewsItem
+        self,
+        news_article_id: int,
+        review_data: ReviewedNewsItem,
+        cur=None,
+        review_json: Optional[str] = None,
     ) -> int:
         """
         Alias for save_review to maintain compatibility with ArticleRejectAgent.
         Args:
             news_article_id: Integer ID from news_article table
             review_data: ReviewedNewsItem object containing the review
+            cur: Optional cursor of the caller's transaction (or pipeline). When
+                given, the review is written on it and the caller commits.
+            review_json: Optional pre-serialized review_data (model_dump_json())
         Returns:
             int: The article_id (for logging purposes)
         """
         # Convert integer ID to string for internal use
         article_id_str = str(news_article_id)
+        if cur is not None:
+            self._write_review(cur, article_id_str, review_data, review_json)
+            return news_article_id
         # Call existing save_review method
-        success = self.save_review(article_id_str, review_data)
+        success = self.save_review(article_id_str, review_data, review_json)
         if success:
             return news_article_id  # Return original ID for logging
         else:
@@ -267,7 +311,7 @@ class EditorialReviewService:
     def get_review(self, article_id: str) -> Optional[ReviewedNewsItem]:
         """Get editorial review by article ID"""
         try:
-            with psycopg.connect(self.db_dsn) as conn:
+            with self.connection() as conn:
                 with conn.cursor() as cur:
                     cur.execute(
                         """
@@ -290,7 +334,7 @@ class EditorialReviewService:
     def get_articles_by_status(self, status: str) -> List[Dict[str, Any]]:
         """Get articles by review status"""
         try:
-            with psycopg.connect(self.db_dsn) as conn:
+            with self.connection() as conn:
                 with conn.cursor() as cur:
                     cur.execute(
                         """
@@ -320,7 +364,7 @@ class EditorialReviewService:
     def get_reviewer_stats(self, reviewer: str) -> Dict[str, Any]:
         """Get statistics for a specific reviewer"""
         try:
-            with psycopg.connect(self.db_dsn) as conn:
+            with self.connection() as conn:
                 with conn.cursor() as cur:
                     cur.execute(
                         """
@@ -357,7 +401,7 @@ class EditorialReviewService:
     def get_articles_with_warnings(self) -> List[Dict[str, Any]]:
         """Get all articles that have editorial warnings"""
         try:
-            with psycopg.connect(self.db_dsn) as conn:
+            with self.connection() as conn:
                 with conn.cursor() as cur:
                     cur.execute(
                         """
@@ -385,7 +429,7 @@ class EditorialReviewService:
     def get_articles_needing_attention(self) -> List[Dict[str, Any]]:
         """Get articles that need editorial attention (not OK status)"""
         try:
-            with psycopg.connect(self.db_dsn) as conn:
+            with self.connection() as conn:
                 with conn.cursor() as cur:
                     cur.execute(
                         """
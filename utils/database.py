@@ -1,9 +1,9 @@
 # utils/database.py
 import asyncpg
-import psycopg
 import os
 import logging
 from dotenv import load_dotenv
+from psycopg_pool import AsyncConnectionPool
 
 load_dotenv()
 logger = logging.getLogger(__name__)
@@ -11,6 +11,9 @@ logger = logging.getLogger(__name__)
 # Database connection pool (GraphQL:lle)
 db_pool = None
 
+# psycopg connection pool for API routes (opened in server.py lifespan)
+api_pool = None
+
 
 async def get_db_pool():
     """Get or create database connection pool (GraphQL)"""
@@ -23,8 +26,10 @@ async def get_db_pool():
                 database=os.getenv("DB_NAME"),
                 user=os.getenv("DB_USER"),
                 password=os.getenv("DB_PASSWORD"),
-                min_size=1,
+                min_size=2,
                 max_size=10,
+                max_inactive_connection_lifetime=300,
+                statement_cache_size=1024,
             )
             logger.info("Database connection pool created successfully")
         except Exception as e:
@@ -42,7 +47,41 @@ async def close_db_pool():
         logger.info("Database connection pool closed")
 
 
+def _get_api_pool() -> AsyncConnectionPool:
+    global api_pool
+    if api_pool is None:
+        api_pool = AsyncConnectionPool(
+            os.getenv("DATABASE_URL"),
+            min_size=4,
+            max_size=32,
+            kwargs={"prepare_threshold": 5},
+            open=False,
+        )
+    return api_pool
+
+
+async def open_api_pool():
+    """Open the API route connection pool (call on server startup)"""
+    await _get_api_pool().open()
+    logger.info("API connection pool opened")
+
+
+async def close_api_pool():
+    """Close the API route connection pool"""
+    global api_pool
+    if api_pool:
+        await api_pool.close()
+        api_pool = None
+        logger.info("API connection pool closed")
+
+
 async def get_db_connection():
-    """Simple connection for API routes (psycopg)"""
-    DATABASE_URL = os.getenv("DATABASE_URL")
-    return await psycopg.AsyncConnection.connect(DATABASE_URL)
+    """Pooled connection for API routes (psycopg).
+
+    Use as ``async with await get_db_connection() as conn:``; the connection
+    is committed/rolled back and returned to the pool when the block exits.
+    """
+    pool = _get_api_pool()
+    if pool.closed:
+        await pool.open()
+    return pool.connection()
@@ -1,37 +1,139 @@
 # utils/interview_processor.py
 import asyncio
+import atexit
 import logging
-from typing import List, Dict, Any, Optional
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Set, Union
 
 from integrations.phone_interview_integration import enrich_article_with_phone_call
 
 logger = logging.getLogger(__name__)
 
+# Finished calls waiting for enrichment; a full queue makes callers wait
+ENRICH_QUEUE_SIZE = 32
+# Consumers of the queue, one per enrichment thread
+ENRICH_WORKERS = int(os.getenv("ENRICH_POOL_SIZE", "4"))
 
-async def process_call_ended(article_id: int, interview_content: List[Dict[str, Any]]) -> Optional[Any]:
-    """Kick off article enrichment with the interview content without blocking the event loop."""
-    # Build a simple transcript text
-    interview_text = "\n".join([
-        f"{t.get('speaker')}: {t.get('text')}" for t in interview_content
-    ])
+# Enrichment gets its own threads so it never queues behind (or starves) the
+# default executor used by asyncio.to_thread elsewhere in the server.
+# There is no asyncio timeout around the jobs: cancelling the await would not
+# stop the thread, so a hung job would keep its slot while the worker moved on,
+# and the clock would also count time spent waiting for a free thread. The
+# integration bounds its own OpenAI and database calls instead.
+_ENRICH_POOL = ThreadPoolExecutor(
+    max_workers=ENRICH_WORKERS,
+    thread_name_prefix="enrich",
+)
+atexit.register(_ENRICH_POOL.shutdown, wait=False)
 
-    logger.info(
-        "▶️ Starting enrichment for article %s (turns=%d)", article_id, len(interview_content)
-    )
+_enrich_queue: Optional[asyncio.Queue] = None
+_enrich_loop: Optional[asyncio.AbstractEventLoop] = None
+_enrich_workers: List[asyncio.Task] = []
+# Strong references to scheduled enrichments; the loop only keeps weak ones
+_scheduled: Set[asyncio.Task] = set()
+
+
+def _get_enrich_queue() -> asyncio.Queue:
+    """Return the enrichment queue of the running loop, starting its workers."""
+    global _enrich_queue, _enrich_loop, _enrich_workers
     loop = asyncio.get_running_loop()
+    if _enrich_queue is None or _enrich_loop is not loop:
+        _enrich_queue = asyncio.Queue(maxsize=ENRICH_QUEUE_SIZE)
+        _enrich_loop = loop
+        _enrich_workers = [
+            loop.create_task(_run_enrich_worker(_enrich_queue))
+            for _ in range(ENRICH_WORKERS)
+        ]
+    return _enrich_queue
+
+
+def _build_and_enrich(
+    article_id: str, interview_content: Union[str, List[Dict[str, Any]]]
+) -> Optional[Any]:
+    """Build the transcript text and enrich the article (runs on the enrich pool).
+
+    Returns None without enriching when a turn lacks ``speaker`` or ``text``.
+    """
+    if isinstance(interview_content, str):
+        # Already a joined transcript (e.g. replayed from storage)
+        return enrich_article_with_phone_call(article_id, interview_content)
+
+    # Build a simple transcript text
+    parts = []
+    append = parts.append
     try:
-        # Run potentially blocking sync function on a thread, with a generous timeout
-        result = await asyncio.wait_for(
-            loop.run_in_executor(
-                None, enrich_article_with_phone_call, str(article_id), interview_text
-            ),
-            timeout=300,
+        for t in interview_content:
+            append(f"{t['speaker']}: {t['text']}")
+    except KeyError as e:
+        logger.error(
+            "❌ Malformed interview turn for article %s (missing %s): %r", article_id, e, t
         )
-        logger.info("✅ Enrichment done for article %s", article_id)
-        return result
-    except asyncio.TimeoutError:
-        logger.error("⏱️ Enrichment timed out for article %s", article_id)
         return None
-    except Exception as e:
-        logger.exception("❌ Enrichment failed for article %s: %s", article_id, e)
-        return None
\ No newline at end of file
+    return enrich_article_with_phone_call(article_id, "\n".join(parts))
+
+
+async def _run_enrich_worker(queue: asyncio.Queue) -> None:
+    """Take queued articles one at a time and enrich them on the enrich pool."""
+    loop = asyncio.get_running_loop()
+    while True:
+        article_id, interview_content, future = await queue.get()
+        result = None
+        try:
+            result = await loop.run_in_executor(
+                _ENRICH_POOL,
+                _build_and_enrich,
+                article_id,
+                interview_content,
+            )
+            if result is not None:
+                logger.info("✅ Enrichment done for article %s", article_id)
+        except Exception as e:
+            logger.exception("❌ Enrichment failed for article %s: %s", article_id, e)
+        finally:
+            queue.task_done()
+            if not future.done():
+                future.set_result(result)
+
+
+async def process_call_ended(
+    article_id: int, interview_content: Union[str, List[Dict[str, Any]]]
+) -> Optional[Any]:
+    """Queue article enrichment with the interview content and wait for its result.
+
+    ``interview_content`` is either the list of dialogue turns or an already
+    joined transcript string, which is passed through as is.
+    """
+    logger.debug(
+        "▶️ Starting enrichment for article %s (turns=%d)", article_id, len(interview_content)
+    )
+    future = asyncio.get_running_loop().create_future()
+    # Enrichment takes the id as text; convert once for the worker and its logs
+    await _get_enrich_queue().put((str(article_id), interview_content, future))
+    return await future
+
+
+def _on_enrichment_done(task: asyncio.Task) -> None:
+    """Drop the finished task and log anything the worker did not already log."""
+    _scheduled.discard(task)
+    if task.cancelled():
+        logger.warning("⚠️ %s cancelled before it finished", task.get_name())
+    elif task.exception() is not None:
+        logger.error("❌ %s crashed", task.get_name(), exc_info=task.exception())
+
+
+def schedule_enrichment(
+    article_id: int, interview_content: Union[str, List[Dict[str, Any]]]
+) -> asyncio.Task:
+    """Start enrichment in the background and return its task without waiting.
+
+    Callers that need the result can still await the returned task; the
+    outcome is logged either way.
+    """
+    task = asyncio.create_task(
+        process_call_ended(article_id, interview_content),
+        name=f"Enrichment for article {article_id}",
+    )
+    _scheduled.add(task)
+    task.add_done_callback(_on_enrichment_done)
+    return task
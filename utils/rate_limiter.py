@@ -0,0 +1,79 @@
+# utils/rate_limiter.py
+import asyncio
+import time
+from typing import Optional
+
+
+class RateLimiter:
+    """Async token bucket allowing ``rate`` calls per ``per`` seconds, bursting up to ``burst``.
+
+    Call ``await acquire()`` before each request. When the API answers with a
+    rate-limit error (HTTP 429) call ``backoff()``: the sustained rate is halved
+    and all callers pause for an exponentially growing delay. ``success()``
+    resets the backoff and slowly restores the configured rate.
+    """
+
+    def __init__(
+        self,
+        rate: float = 5,
+        per: float = 1.0,
+        burst: int = 10,
+        base_backoff: float = 1.0,
+        max_backoff: float = 30.0,
+    ):
+        self.max_rate = rate / per  # tokens per second
+        self.rate = self.max_rate
+        self.min_rate = self.max_rate / 8
+        self.burst = burst
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._failures = 0
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_lock(self) -> asyncio.Lock:
+        """Return a lock bound to the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated_at
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+        self._updated_at = now
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent."""
+        async with self._get_lock():
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def backoff(self) -> float:
+        """Register a rate-limit response. Returns the pause in seconds."""
+        self._failures += 1
+        self.rate = max(self.min_rate, self.rate / 2)
+        delay = min(self.max_backoff, self.base_backoff * 2 ** (self._failures - 1))
+        self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        return delay
+
+    def success(self) -> None:
+        """Register a successful request."""
+        self._failures = 0
+        if self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate * 1.25)